@@ -1,38 +1,29 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import os
 import streamlit as st
-from workflow import create_workflow
+from services.upstream_scheduler import UpstreamBusyError
+from workflow import BUSY_RESPONSE, get_workflow, initial_state, warm_up
 
 st.set_page_config(page_title="AI Loan Officer", page_icon="🏦")
 
+@st.cache_resource
+def load_workflow():
+    """Build the compiled workflow once per process and share it across sessions."""
+    if os.getenv("WARM_UP_ON_BOOT", "").lower() in ("1", "true", "yes"):
+        warm_up()
+    return get_workflow()
+
 # session initialization
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
 if "workflow_state" not in st.session_state:
-    st.session_state.workflow_state = {
-        "user_input": "",
-        "messages": [],
-        "mode": "qa",
-        "intent": None,
-        "retrieved_docs": None,
-        "context": None,
-        "credit_score": None,
-        "home_value": None,
-        "down_payment": None,
-        "loan_amount": None,
-        "income": None,
-        "debts": None,
-        "loan_term": None,
-        "application_step": None,
-        "subprime_continue": None,
-        "final_response": None,
-        "calculated_rate": None
-    }
+    st.session_state.workflow_state = initial_state()
 
 if "workflow" not in st.session_state:
-    st.session_state.workflow = create_workflow()
+    st.session_state.workflow = load_workflow()
 
 # Title
 st.title("🏦 AI Loan Officer")
@@ -53,7 +44,11 @@ if prompt := st.chat_input("How can I help you today?"):
     st.session_state.workflow_state["user_input"] = prompt
 
     with st.spinner("Thinking..."):
-        result = st.session_state.workflow.invoke(st.session_state.workflow_state)
+        try:
+            result = st.session_state.workflow.invoke(st.session_state.workflow_state)
+        except UpstreamBusyError:
+            # Keep the conversation where it was so the same message can be sent again
+            result = {**st.session_state.workflow_state, "final_response": BUSY_RESPONSE}
 
     st.session_state.workflow_state = result
 
@@ -78,23 +73,5 @@ with st.sidebar:
 
     if st.button("Clear Conversation"):
         st.session_state.messages = []
-        st.session_state.workflow_state = {
-            "user_input": "",
-            "messages": [],
-            "mode": "qa",
-            "intent": None,
-            "retrieved_docs": None,
-            "context": None,
-            "credit_score": None,
-            "home_value": None,
-            "down_payment": None,
-            "loan_amount": None,
-            "income": None,
-            "debts": None,
-            "loan_term": None,
-            "application_step": None,
-            "subprime_continue": None,
-            "final_response": None,
-            "calculated_rate": None
-        }
+        st.session_state.workflow_state = initial_state()
         st.rerun()
@@ -0,0 +1,111 @@
+"""
+Local stand-ins for the OpenAI chat and embeddings clients.
+
+They sleep for a configurable latency instead of calling the API, and the chat
+model records its own concurrency and enforces a provider-side rate limit, so
+load tests can show what the real provider would have seen.
+"""
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+from langchain_core.messages import AIMessage
+
+class FakeChatModel:
+    """Drop-in for ChatOpenAI.invoke with simulated latency and provider rate limiting."""
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05,
+                 respond: Optional[Callable[[list], str]] = None,
+                 provider_rate_limit: Optional[float] = None):
+        """
+        Args:
+            latency: Mean seconds per call.
+            jitter: Uniform +/- seconds added to each call.
+            respond: Builds the reply from the prompt messages; defaults to "ok".
+            provider_rate_limit: Calls per second the provider accepts before answering 429.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.respond = respond or (lambda messages: "ok")
+        self.provider_rate_limit = provider_rate_limit
+
+        self._lock = threading.Lock()
+        self._recent: deque = deque()
+        self._active = 0
+        self.calls = 0
+        self.max_concurrency = 0
+        self.rate_limit_errors = 0
+
+    def invoke(self, prompt_value, config=None) -> AIMessage:
+        with self._lock:
+            now = time.monotonic()
+            self.calls += 1
+            self._active += 1
+            self.max_concurrency = max(self.max_concurrency, self._active)
+            self._recent.append(now)
+            while self._recent and now - self._recent[0] > 1.0:
+                self._recent.popleft()
+            limited = self.provider_rate_limit is not None and len(self._recent) > self.provider_rate_limit
+            if limited:
+                self.rate_limit_errors += 1
+
+        try:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+            if limited:
+                raise RuntimeError("429 Too Many Requests (fake provider)")
+            return AIMessage(content=self.respond(prompt_value.to_messages()))
+        finally:
+            with self._lock:
+                self._active -= 1
+
+class FakeEmbeddings:
+    """Drop-in for OpenAIEmbeddings returning deterministic pseudo-random vectors."""
+
+    def __init__(self, latency: float = 0.05, dim: int = 1536):
+        self.latency = latency
+        self.dim = dim
+        self.calls = 0
+
+    def _vector(self, text: str) -> list[float]:
+        rng = random.Random(text)
+        return [rng.uniform(-1, 1) for _ in range(self.dim)]
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._vector(text)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+class FakeVectorStore:
+    """Drop-in for the Chroma store: embeds the query (simulated latency) and returns chunks by hash."""
+
+    def __init__(self, documents: list, embeddings: FakeEmbeddings):
+        self.documents = documents
+        self.embeddings = embeddings
+
+    def similarity_search(self, query: str, k: int = 4) -> list:
+        vector = self.embeddings.embed_query(query)
+        start = int(abs(vector[0]) * len(self.documents))
+        return [self.documents[(start + i) % len(self.documents)] for i in range(min(k, len(self.documents)))]
+
+def workflow_responder(messages: list) -> str:
+    """Plausible replies to the workflow's prompts, keyed on their system instructions."""
+    system = messages[0].content if messages else ""
+    human = messages[-1].content if messages else ""
+    text = human.lower()
+
+    if "greeting detector" in system:
+        return "yes" if text.strip(" !.") in ("hi", "hello", "hey", "good morning") else "no"
+    if "topic validator" in system or "relevance evaluator" in system:
+        return "yes"
+    if "routing assistant" in system:
+        return "application" if any(word in text for word in ("apply", "application", "i want a loan")) else "qa"
+    if "data extraction assistant" in system:
+        # The simulated borrowers' answers are all parsed locally; anything else is not understood
+        return "{}"
+    return "Based on our guidelines, " + " ".join(["that depends on your credit profile and loan type."] * 4)
@@ -0,0 +1,88 @@
+"""
+Import-time benchmark for the app entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for each
+module, reports the total and the slowest imports, and appends the run to a JSON
+history so cold-start cost can be compared across releases.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --modules workflow retriever --top 15
+"""
+import argparse
+import json
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+RESULTS_PATH = Path(__file__).parent / "results" / "import_time.json"
+DEFAULT_MODULES = ["workflow", "retriever", "tools.rate_tool", "services.rate_calculator"]
+
+def measure_import(module: str) -> dict:
+    """Import a module in a fresh interpreter and parse the -X importtime report."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "name": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+
+    # Top-level entries are not nested under another import, so their cumulative times add up to the total
+    total_us = sum(entry["cumulative_us"] for entry in entries if entry["depth"] == 0)
+    return {"module": module, "total_us": total_us, "entries": entries}
+
+def git_revision() -> str:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+    return proc.stdout.strip() or "unknown"
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time of the app modules.")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to print per module")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    run = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "modules": {},
+    }
+
+    for module in args.modules:
+        result = measure_import(module)
+        slowest = sorted(result["entries"], key=lambda e: e["self_us"], reverse=True)[:args.top]
+
+        print(f"\n{module}: {result['total_us'] / 1000:.1f} ms")
+        for entry in slowest:
+            print(f"  {entry['self_us'] / 1000:8.1f} ms  {entry['name']}")
+
+        run["modules"][module] = {
+            "total_ms": round(result["total_us"] / 1000, 2),
+            "slowest": [{"name": e["name"], "self_ms": round(e["self_us"] / 1000, 2)} for e in slowest],
+        }
+
+    history = json.loads(args.output.read_text()) if args.output.exists() else []
+    history.append(run)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(history, indent=2))
+    print(f"\nAppended results for {run['revision']} to {args.output}")
+
+if __name__ == "__main__":
+    main()
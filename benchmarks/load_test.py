@@ -0,0 +1,198 @@
+"""
+Load test: many simulated borrowers driven concurrently through the compiled workflow.
+
+Each simulated borrower runs either a Q&A script or a full application, answering
+whatever the assistant asks next. The OpenAI chat model, embeddings and vector
+store are replaced by fakes with configurable latency, so the numbers show what
+one process can sustain independent of the provider. Sessions run in threads,
+as Streamlit runs them.
+
+Reports throughput, p50/p95/p99 turn latency and memory per concurrent session
+for each concurrency level.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 1 10 50 100 --llm-latency 0.5
+    python benchmarks/load_test.py --concurrency 25 --rps 5 --max-in-flight 8 --output results/load.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+DOCS_DIR = Path(__file__).parent.parent / "docs"
+
+QA_SCRIPT = [
+    "hi",
+    "What credit score do I need for a mortgage?",
+    "What is PMI?",
+    "How is DTI calculated?",
+]
+
+APPLICATION_OPENER = "I want to apply for a mortgage"
+
+# Replies keyed by a phrase in the assistant's question, checked in order
+APPLICATION_ANSWERS = [
+    ("credit score", "My credit score is 750"),
+    ("home value", "$400,000"),
+    ("down payment", "20%"),
+    ("annual income", "$120,000"),
+    ("monthly debt", "1500"),
+    ("loan term", "30 years"),
+    ("loan product", "Conventional"),
+    ("primary residence", "Primary residence"),
+    ("see your rate", "yes"),
+    ("continue", "yes"),
+]
+
+MAX_TURNS = 20
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def install_fakes(args):
+    """Swap the OpenAI clients and vector store for fakes with the configured latency."""
+    from langchain_core.documents import Document
+    import llm
+    import retriever
+    from services.lexical_index import BM25Index
+    from services.upstream_scheduler import UpstreamScheduler
+    from benchmarks.fake_provider import FakeChatModel, FakeEmbeddings, FakeVectorStore, workflow_responder
+
+    chunks = []
+    for path in sorted(DOCS_DIR.glob("*.md")):
+        text = path.read_text()
+        for start in range(0, len(text), 312):
+            chunks.append(Document(page_content=text[start:start + 512], metadata={"source": str(path), "start_index": start}))
+
+    provider = FakeChatModel(latency=args.llm_latency, jitter=args.llm_latency * 0.2, respond=workflow_responder)
+    embeddings = FakeEmbeddings(latency=args.embedding_latency, dim=64)
+
+    llm._chat_model = provider
+    llm._embeddings = llm.CoalescedEmbeddings(embeddings, "fake-embeddings")
+    retriever._vector_store = FakeVectorStore(chunks, llm._embeddings)
+    retriever._lexical_index = BM25Index([c.page_content for c in chunks], [c.metadata for c in chunks])
+    retriever._lexical_index_checked = True
+
+    if args.rps is None:
+        # Measure the process, not our own provider-protection limits
+        llm.scheduler = UpstreamScheduler(max_in_flight=10**6, requests_per_second=10**6, burst=10**6, max_queue=10**6)
+    else:
+        llm.scheduler = UpstreamScheduler(max_in_flight=args.max_in_flight, requests_per_second=args.rps,
+                                          burst=args.burst, max_queue=10**6)
+    return provider
+
+def run_session(graph, initial_state, kind: str) -> list[float]:
+    """Play one borrower through the workflow and return the latency of each turn."""
+    state = initial_state()
+    latencies = []
+
+    def turn(message: str):
+        nonlocal state
+        state["user_input"] = message
+        start = time.perf_counter()
+        state = graph.invoke(state)
+        latencies.append(time.perf_counter() - start)
+
+    if kind == "qa":
+        for message in QA_SCRIPT:
+            turn(message)
+        return latencies
+
+    turn(APPLICATION_OPENER)
+    while len(latencies) < MAX_TURNS and state.get("application_step") != "ended":
+        question = (state.get("final_response") or "").lower()
+        reply = next((answer for phrase, answer in APPLICATION_ANSWERS if phrase in question), None)
+        if reply is None:
+            raise RuntimeError(f"Simulated borrower has no answer for: {state.get('final_response')!r}")
+        turn(reply)
+    return latencies
+
+def run_level(graph, initial_state, concurrency: int, sessions: int, qa_ratio: float, trace_memory: bool) -> dict:
+    rng = random.Random(concurrency)
+    kinds = ["qa" if rng.random() < qa_ratio else "application" for _ in range(sessions)]
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda kind: run_session(graph, initial_state, kind), kinds))
+    elapsed = time.perf_counter() - start
+    peak_bytes = 0
+    if trace_memory:
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies = [latency for session in results for latency in session]
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "turns": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(len(latencies) / elapsed, 2),
+        "sessions_per_s": round(sessions / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1),
+        "peak_memory_mb": round(peak_bytes / 2**20, 2) if trace_memory else None,
+        "memory_per_session_kb": round(peak_bytes / concurrency / 1024, 1) if trace_memory else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated borrowers through the workflow.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--sessions-per-worker", type=int, default=2)
+    parser.add_argument("--qa-ratio", type=float, default=0.5, help="Share of sessions running the Q&A script")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Fake chat model latency in seconds")
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="Fake embedding latency in seconds")
+    parser.add_argument("--rps", type=float, default=None, help="Apply the upstream scheduler rate limit (default: unlimited)")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--cache", action="store_true", help="Enable the response cache (fresh temporary database)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (it slows every allocation)")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    # The response cache is configured at import; keep runs independent of each other
+    os.environ["LLM_CACHE_PATH"] = str(Path(os.getenv("TMPDIR", "/tmp")) / f"load_test_cache_{os.getpid()}.sqlite3") if args.cache else ""
+
+    import llm
+    import retriever
+    from workflow import create_workflow, initial_state
+
+    provider = install_fakes(args)
+    graph = create_workflow()
+
+    print(f"Fake chat latency {args.llm_latency * 1000:.0f} ms, embedding latency {args.embedding_latency * 1000:.0f} ms, "
+          f"{args.qa_ratio:.0%} Q&A sessions\n")
+    print(f"{'conc':>5} {'sessions':>8} {'turns':>6} {'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'KB/session':>11}")
+
+    levels = []
+    for concurrency in args.concurrency:
+        level = run_level(graph, initial_state, concurrency, concurrency * args.sessions_per_worker,
+                          args.qa_ratio, trace_memory=not args.no_memory)
+        levels.append(level)
+        memory = f"{level['memory_per_session_kb']:11.1f}" if level["memory_per_session_kb"] is not None else f"{'-':>11}"
+        print(f"{level['concurrency']:5d} {level['sessions']:8d} {level['turns']:6d} {level['turns_per_s']:8.1f} "
+              f"{level['p50_ms']:8.1f} {level['p95_ms']:8.1f} {level['p99_ms']:8.1f} {memory}")
+
+    print(f"\nUpstream chat calls: {provider.calls} (peak concurrency {provider.max_concurrency})")
+    print(f"Coalescing/scheduler/cache: {json.dumps(llm.get_metrics(), default=str)}")
+    print(f"Retrieval prefetch: {json.dumps(retriever.prefetcher.metrics())}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({"args": {k: str(v) for k, v in vars(args).items()}, "levels": levels}, indent=2))
+        print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Micro-benchmarks for the rate calculation hot path.
+
+Covers matrix load time, a single matching lookup, the worst-case no-match lookup,
+the tool wrappers (text and structured) and batch pricing, over synthetic rate
+matrices from 150 to 100k rows. Results are written as JSON per commit so runs
+can be compared:
+
+Usage:
+    python benchmarks/rate_calculator.py
+    python benchmarks/rate_calculator.py --sizes 150 10000 --compare benchmarks/results/rate_calculator-abc1234.json
+"""
+import argparse
+import csv
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from services.rate_calculator import RateCalculator
+import tools.rate_tool as rate_tool
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_SIZES = [150, 1_000, 10_000, 100_000]
+LOAN_TERMS = [15, 30]
+LTV_LEVELS = [60, 70, 80, 90, 95]
+DTI_LEVELS = [36, 43, 50]
+MAX_CREDIT_TIERS = 551  # distinct whole scores from 300 to 850
+BATCH_SIZE = 1_000
+
+def write_synthetic_matrix(path: Path, rows: int) -> None:
+    """
+    Writes a rate matrix shaped like docs/rate_matrix.csv with about `rows` rows.
+
+    Credit tiers are added (highest first, like the real sheet) until the row count
+    is reached. Tiers are whole scores, so there are at most 551 (850 down to 300);
+    beyond that, DTI levels are added between 30% and 55% instead.
+    """
+    per_tier = len(LOAN_TERMS) * len(LTV_LEVELS) * len(DTI_LEVELS)
+    tiers = min(MAX_CREDIT_TIERS, max(1, round(rows / per_tier)))
+    credit_tiers = [850 - round(i * 550 / (tiers - 1)) for i in range(tiers)] if tiers > 1 else [850]
+
+    dti_count = max(len(DTI_LEVELS), round(rows / (len(LOAN_TERMS) * len(LTV_LEVELS) * tiers)))
+    if dti_count == len(DTI_LEVELS):
+        dti_levels = DTI_LEVELS
+    else:
+        dti_levels = [round(30 + i * 25 / (dti_count - 1), 2) for i in range(dti_count)]
+
+    with open(path, mode='w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["min_credit", "max_ltv", "max_dti", "loan_term", "rate"])
+        for term in sorted(LOAN_TERMS, reverse=True):
+            for t, credit in enumerate(credit_tiers):
+                for l, ltv in enumerate(LTV_LEVELS):
+                    for d, dti in enumerate(dti_levels):
+                        rate = 5.5 + (0.75 if term == 30 else 0) + t * 1.5 / tiers + l * 0.125 + d * 0.375 / len(dti_levels)
+                        writer.writerow([credit, ltv, dti, term, f"{rate:.3f}"])
+
+def per_op_us(fn, number: int, repeat: int = 5) -> float:
+    """Median microseconds per call over `repeat` runs of `number` calls."""
+    runs = timeit.repeat(fn, number=number, repeat=repeat)
+    return statistics.median(runs) / number * 1e6
+
+def iterations_for(rows: int) -> int:
+    # Keep each measurement in the tens of milliseconds for linear-time operations
+    return max(5, min(20_000, 2_000_000 // rows))
+
+def bench_size(rows: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "rate_matrix.csv"
+        write_synthetic_matrix(path, rows)
+
+        load_runs = []
+        for _ in range(3):
+            start = time.perf_counter()
+            calculator = RateCalculator(matrix_path=path)
+            load_runs.append(time.perf_counter() - start)
+
+    # Route the tool wrappers to this matrix
+    rate_tool._calculator = calculator
+    n = iterations_for(rows)
+
+    # A typical approved application: mid credit, 80% LTV, 36% DTI
+    match_args = dict(credit_score=720, ltv=80.0, dti=36.0, loan_term=30)
+    # No row matches: the worst case for a scan of the matrix
+    no_match_args = dict(credit_score=720, ltv=99.0, dti=36.0, loan_term=30)
+
+    rng = random.Random(0)
+    batch = [
+        dict(credit_score=rng.randint(560, 850), ltv=rng.uniform(50, 100), dti=rng.uniform(20, 55), loan_term=rng.choice(LOAN_TERMS))
+        for _ in range(BATCH_SIZE)
+    ]
+    batch_n = max(1, n // BATCH_SIZE)
+
+    return {
+        "rows": len(calculator.rate_matrix),
+        "credit_tiers": len({row["min_credit"] for row in calculator.rate_matrix}),
+        "dti_levels": len({row["max_dti"] for row in calculator.rate_matrix}),
+        "load_ms": round(statistics.median(load_runs) * 1000, 3),
+        "lookup_us": round(per_op_us(lambda: calculator.calculate(**match_args), n), 3),
+        "no_match_us": round(per_op_us(lambda: calculator.calculate(**no_match_args), n), 3),
+        "quote_no_match_us": round(per_op_us(lambda: calculator.quote(**no_match_args), n), 3),
+        "text_tool_us": round(per_op_us(lambda: rate_tool.rate_calculation_tool.run("720,80,36,30"), min(n, 2_000)), 3),
+        "structured_tool_us": round(per_op_us(lambda: rate_tool.rate_quote_tool.invoke(match_args), min(n, 2_000)), 3),
+        "batch_pricing_ms": round(per_op_us(lambda: [calculator.calculate(**app) for app in batch], batch_n) / 1000, 3),
+    }
+
+def git_revision() -> str:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+    return proc.stdout.strip() or "unknown"
+
+def print_results(results: list[dict], baseline: dict = None) -> None:
+    columns = ["rows", "load_ms", "lookup_us", "no_match_us", "quote_no_match_us", "text_tool_us", "structured_tool_us", "batch_pricing_ms"]
+    print(" ".join(f"{column:>18}" for column in columns))
+    base_by_rows = {entry["rows"]: entry for entry in baseline["results"]} if baseline else {}
+    for entry in results:
+        print(" ".join(f"{entry[column]:>18}" for column in columns))
+        base = base_by_rows.get(entry["rows"])
+        if base:
+            deltas = [f"{(entry[c] / base[c] - 1) * 100:+.1f}%" if base.get(c) else "" for c in columns[1:]]
+            print(" ".join([f"{'vs ' + baseline['revision']:>18}"] + [f"{d:>18}" for d in deltas]))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rate calculation over synthetic matrices.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Approximate matrix row counts")
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/rate_calculator-<rev>.json)")
+    parser.add_argument("--compare", type=Path, help="A previous result file to compare against")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    results = []
+    for rows in args.sizes:
+        print(f"Benchmarking ~{rows} rows...", file=sys.stderr)
+        results.append(bench_size(rows))
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_results(results, baseline)
+
+    output = args.output or RESULTS_DIR / f"rate_calculator-{revision}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "revision": revision,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "results": results,
+    }, indent=2))
+    print(f"\nWrote {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Load test for the upstream call scheduler against the fake provider.
+
+Simulated sessions fire chat calls through llm.get_llm() at application and Q&A
+priority. The report shows queue wait per priority, queue depth, rejections and
+what the provider saw (peak concurrency, rate-limit errors). Re-run with
+--no-scheduler-limits to see the burst hit the provider directly.
+
+Usage:
+    python benchmarks/scheduler_load.py --sessions 50 --calls 4 --rps 5 --max-in-flight 8
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.prompts import ChatPromptTemplate
+import llm
+from services.upstream_scheduler import UpstreamScheduler, QueueFullError, PRIORITY_APPLICATION, PRIORITY_QA
+from benchmarks.fake_provider import FakeChatModel
+
+PRIORITY_NAMES = {PRIORITY_APPLICATION: "application", PRIORITY_QA: "qa"}
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the upstream scheduler with a fake provider.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=4, help="Calls per session")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake provider latency in seconds")
+    parser.add_argument("--provider-rps", type=float, default=10, help="Provider rate limit (calls/second)")
+    parser.add_argument("--rps", type=float, default=5, help="Scheduler rate limit per model")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=500)
+    parser.add_argument("--no-scheduler-limits", action="store_true", help="Admit everything immediately")
+    args = parser.parse_args()
+
+    provider = FakeChatModel(latency=args.latency, provider_rate_limit=args.provider_rps)
+    llm._chat_model = provider
+    if args.no_scheduler_limits:
+        llm.scheduler = UpstreamScheduler(max_in_flight=10**6, requests_per_second=10**6, burst=10**6, max_queue=10**6)
+    else:
+        llm.scheduler = UpstreamScheduler(max_in_flight=args.max_in_flight, requests_per_second=args.rps,
+                                          burst=args.burst, max_queue=args.max_queue)
+
+    prompt = ChatPromptTemplate.from_messages([("human", "{input}")])
+    errors = {"rejected": 0, "provider": 0}
+    latencies = {name: [] for name in PRIORITY_NAMES.values()}
+    lock = threading.Lock()
+
+    def session(session_id: int):
+        for call in range(args.calls):
+            priority = PRIORITY_APPLICATION if (session_id + call) % 2 == 0 else PRIORITY_QA
+            chain = prompt | llm.get_llm(priority)
+            start = time.perf_counter()
+            try:
+                # Unique input per call so request coalescing does not hide the load
+                chain.invoke({"input": f"session {session_id} call {call}"})
+            except QueueFullError:
+                with lock:
+                    errors["rejected"] += 1
+                continue
+            except RuntimeError:
+                with lock:
+                    errors["provider"] += 1
+                continue
+            with lock:
+                latencies[PRIORITY_NAMES[priority]].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    metrics = llm.scheduler.metrics()
+    completed = sum(len(values) for values in latencies.values())
+    print(f"{args.sessions} sessions x {args.calls} calls in {elapsed:.2f}s ({completed / elapsed:.1f} calls/s completed)")
+    for name, values in latencies.items():
+        if values:
+            values.sort()
+            print(f"  {name:<12} n={len(values):4d}  p50={values[len(values) // 2]:.2f}s  p95={values[min(len(values) - 1, int(len(values) * 0.95))]:.2f}s")
+    for priority, stats in metrics["wait_seconds"].items():
+        print(f"  queue wait {PRIORITY_NAMES.get(priority, priority):<12} mean={stats['mean']:.2f}s  max={stats['max']:.2f}s")
+    print(f"  max queue depth={metrics['max_queue_depth']}  rejected={errors['rejected']}")
+    print(f"  provider: peak concurrency={provider.max_concurrency}  rate-limit errors={provider.rate_limit_errors}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Throughput of the pre-fork server (server.py) as the worker count grows.
+
+For each worker count the server is started with the fake chat model, embeddings
+and vector store from the load test, installed in the parent before the fork, so
+every worker shares them (and the preloaded rate sheet, indexes and graph) copy-on-write.
+Concurrent HTTP clients then play Q&A and application sessions for a fixed time.
+
+Reports turns per second, p50/p95 turn latency, and per-worker memory (RSS, and
+PSS, which splits shared pages between the processes sharing them).
+
+Usage:
+    python benchmarks/server_scaling.py --workers 1 2 4 8 --clients 32 --duration 20
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Keep the response cache out of the measurement; it is configured at import
+os.environ["LLM_CACHE_PATH"] = ""
+
+from benchmarks.load_test import APPLICATION_ANSWERS, APPLICATION_OPENER, MAX_TURNS, QA_SCRIPT, install_fakes, percentile
+
+HOST = "127.0.0.1"
+
+def post_chat(conn: http.client.HTTPConnection, message: str, state):
+    conn.request("POST", "/chat", body=json.dumps({"message": message, "state": state}),
+                 headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    body = json.loads(response.read())
+    if response.status != 200:
+        raise RuntimeError(f"/chat returned {response.status}: {body}")
+    return body
+
+def play_session(conn: http.client.HTTPConnection, kind: str, latencies: list) -> None:
+    state = None
+
+    def turn(message: str) -> dict:
+        nonlocal state
+        start = time.perf_counter()
+        body = post_chat(conn, message, state)
+        latencies.append(time.perf_counter() - start)
+        state = body["state"]
+        return body
+
+    if kind == "qa":
+        for message in QA_SCRIPT:
+            turn(message)
+        return
+
+    body = turn(APPLICATION_OPENER)
+    # The server resets application_step once the application ends
+    for _ in range(MAX_TURNS):
+        if state.get("application_step") is None:
+            return
+        question = (body["response"] or "").lower()
+        reply = next((answer for phrase, answer in APPLICATION_ANSWERS if phrase in question), None)
+        if reply is None:
+            raise RuntimeError(f"Simulated borrower has no answer for: {body['response']!r}")
+        body = turn(reply)
+
+def client_loop(port: int, deadline: float, seed: int, qa_ratio: float, latencies: list, errors: list) -> None:
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(HOST, port, timeout=60)
+    try:
+        while time.monotonic() < deadline:
+            play_session(conn, "qa" if rng.random() < qa_ratio else "application", latencies)
+    except Exception as e:
+        errors.append(repr(e))
+    finally:
+        conn.close()
+
+def wait_healthy(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(HOST, port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not become healthy")
+
+def worker_pids(port: int, workers: int) -> set[int]:
+    """Collect worker pids from /health; new connections are spread over the workers."""
+    pids = set()
+    for _ in range(workers * 20):
+        conn = http.client.HTTPConnection(HOST, port, timeout=2)
+        conn.request("GET", "/health")
+        pids.add(json.loads(conn.getresponse().read())["pid"])
+        conn.close()
+        if len(pids) == workers:
+            break
+    return pids
+
+def memory_kb(pid: int) -> dict:
+    """RSS and PSS of a process in KB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {name.lower(): int(fields[name].split()[0]) for name in ("Rss", "Pss")}
+    except (OSError, KeyError):
+        return {}
+
+def start_server(port: int, workers: int, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            import server
+            install_fakes(args)
+            server.serve(HOST, port, workers)
+        finally:
+            os._exit(0)
+    return pid
+
+def run_level(workers: int, args) -> dict:
+    port = args.port
+    pid = start_server(port, workers, args)
+    try:
+        wait_healthy(port)
+        pids = worker_pids(port, workers)
+
+        latencies, errors = [], []
+        deadline = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(target=client_loop, args=(port, deadline, i, args.qa_ratio, latencies, errors))
+            for i in range(args.clients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        memory = [memory_kb(p) for p in pids]
+    finally:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+    if errors:
+        print(f"  {len(errors)} client errors, e.g. {errors[0]}", file=sys.stderr)
+    rss = [m["rss"] for m in memory if m]
+    pss = [m["pss"] for m in memory if m]
+    return {
+        "workers": workers,
+        "turns": len(latencies),
+        "turns_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "errors": len(errors),
+        "rss_mb_per_worker": round(sum(rss) / len(rss) / 1024, 1) if rss else None,
+        "pss_mb_per_worker": round(sum(pss) / len(pss) / 1024, 1) if pss else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure pre-fork server throughput by worker count.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent HTTP clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per worker count")
+    parser.add_argument("--qa-ratio", type=float, default=0.5)
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="Fake chat model latency in seconds")
+    parser.add_argument("--embedding-latency", type=float, default=0.005)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+    # Fakes run without the upstream scheduler's rate limit
+    args.rps, args.burst, args.max_in_flight = None, 10, 8
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients, {args.duration:.0f}s per level, "
+          f"fake chat latency {args.llm_latency * 1000:.0f} ms\n")
+    print(f"{'workers':>7} {'turns':>7} {'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'RSS MB':>7} {'PSS MB':>7}")
+    levels = []
+    for workers in args.workers:
+        level = run_level(workers, args)
+        levels.append(level)
+        print(f"{level['workers']:7d} {level['turns']:7d} {level['turns_per_s']:8.1f} {level['p50_ms'] or 0:8.1f} "
+              f"{level['p95_ms'] or 0:8.1f} {level['rss_mb_per_worker'] or 0:7.1f} {level['pss_mb_per_worker'] or 0:7.1f}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({"args": {k: str(v) for k, v in vars(args).items()}, "levels": levels}, indent=2))
+        print(f"\nWrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Recall and latency comparison of the local vector index against Chroma.
+
+Queries are taken from the stored chunk embeddings with a little noise added, so
+no embedding API calls are made. Ground truth is an exact scan over the matrix;
+recall@k is reported for Chroma, the local flat scan and (when hnswlib is
+installed) the local HNSW graph.
+
+Usage:
+    python benchmarks/vector_index.py                      # chroma_db built by load_data.py
+    python benchmarks/vector_index.py --synthetic 100000   # random corpus, 1536 dims
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.local_vector_index import LocalVectorIndex
+
+CHROMA_DB_DIR = Path(__file__).parent.parent / "chroma_db"
+
+def time_queries(search, queries) -> tuple[list[list[int]], list[float]]:
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return results, latencies
+
+def recall(results: list[list[int]], truth: list[list[int]]) -> float:
+    hits = sum(len(set(r) & set(t)) for r, t in zip(results, truth))
+    return hits / sum(len(t) for t in truth)
+
+def report(name: str, results, latencies, truth) -> None:
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<14} recall@k={recall(results, truth):.3f}  p50={p50:9.1f} us  p99={p99:9.1f} us  mean={statistics.mean(latencies):9.1f} us")
+
+def load_corpus(args) -> np.ndarray:
+    if args.synthetic:
+        rng = np.random.default_rng(0)
+        return rng.standard_normal((args.synthetic, args.dim), dtype=np.float32)
+
+    import chromadb
+    collection = chromadb.PersistentClient(path=str(CHROMA_DB_DIR)).get_collection("langchain")
+    return np.asarray(collection.get(include=["embeddings"])["embeddings"], dtype=np.float32)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare local vector index recall and latency against Chroma.")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use a random corpus of this many rows")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--noise", type=float, default=0.05)
+    args = parser.parse_args()
+
+    import chromadb
+
+    embeddings = load_corpus(args)
+    rng = np.random.default_rng(1)
+    picks = rng.integers(0, len(embeddings), size=args.queries)
+    queries = embeddings[picks] + args.noise * rng.standard_normal((args.queries, embeddings.shape[1]), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        texts = [""] * len(embeddings)
+        metadatas = [{} for _ in embeddings]
+
+        flat = LocalVectorIndex.build(Path(tmp) / "flat", embeddings, texts, metadatas, hnsw_min_rows=len(embeddings) + 1)
+
+        # Exact top-k by cosine similarity is the ground truth
+        truth = [[i for i, _ in flat.search(q, k=args.k)] for q in queries]
+
+        # Chroma over the same vectors, in an isolated client so the app's store is untouched
+        client = chromadb.PersistentClient(path=str(Path(tmp) / "chroma"))
+        collection = client.create_collection("bench", metadata={"hnsw:space": "cosine"})
+        for start in range(0, len(embeddings), 5000):
+            collection.add(ids=[str(i) for i in range(start, min(start + 5000, len(embeddings)))],
+                           embeddings=embeddings[start:start + 5000].tolist())
+
+        print(f"{len(embeddings)} vectors x {embeddings.shape[1]} dims, {args.queries} queries, k={args.k}\n")
+
+        results, latencies = time_queries(
+            lambda q: [int(i) for i in collection.query(query_embeddings=[q.tolist()], n_results=args.k)["ids"][0]],
+            queries)
+        report("chroma", results, latencies, truth)
+
+        results, latencies = time_queries(lambda q: [i for i, _ in flat.search(q, k=args.k)], queries)
+        report("local flat", results, latencies, truth)
+
+        hnsw = LocalVectorIndex.build(Path(tmp) / "hnsw", embeddings, texts, metadatas, hnsw_min_rows=0)
+        if hnsw.hnsw is None:
+            # build() falls back to the flat scan without hnswlib; don't report that as HNSW
+            print("local hnsw     skipped (pip install hnswlib)")
+        else:
+            results, latencies = time_queries(lambda q: [i for i, _ in hnsw.search(q, k=args.k)], queries)
+            report("local hnsw", results, latencies, truth)
+
+if __name__ == "__main__":
+    main()
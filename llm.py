@@ -0,0 +1,157 @@
+import os
+import sqlite3
+import threading
+from functools import partial
+from pathlib import Path
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from services.response_cache import ResponseCache
+from services.single_flight import SingleFlight
+from services.upstream_scheduler import UpstreamScheduler, PRIORITY_APPLICATION, PRIORITY_ROUTING, PRIORITY_QA
+
+# Model configuration
+LLM_MODEL = "gpt-4-turbo"
+LLM_TEMPERATURE = 0
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Concurrent identical requests from different sessions share one upstream call
+llm_flights = SingleFlight()
+embedding_flights = SingleFlight()
+
+# Chat calls that do reach upstream are admitted by priority under a rate limit and in-flight cap
+scheduler = UpstreamScheduler(
+    max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+    requests_per_second=float(os.getenv("LLM_REQUESTS_PER_SECOND", "5")),
+    burst=int(os.getenv("LLM_BURST", "10")),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", "200"))
+)
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "60"))
+
+# Persistent cache for short deterministic prompts, shared by every worker process; empty path disables it.
+# The default is inside the project directory, wherever the app is started from.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(Path(__file__).resolve().parent / ".cache" / "llm_responses.sqlite3"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+# Process-level singletons, created on first use so importing this module stays cheap
+_chat_model = None
+_llms = {}
+_embeddings = None
+_response_cache = None
+_response_cache_failed = False
+# Held while creating one of them; session and prefetch threads can make the first call together
+_init_lock = threading.Lock()
+
+def get_chat_model():
+    """Return the shared OpenAI chat model, importing the client on first use."""
+    global _chat_model
+    if _chat_model is None:
+        with _init_lock:
+            if _chat_model is None:
+                from langchain_openai import ChatOpenAI
+                _chat_model = ChatOpenAI(model=LLM_MODEL, temperature=LLM_TEMPERATURE)
+    return _chat_model
+
+def _invoke_chat_model(prompt_value, config, priority):
+    chat_model = get_chat_model()
+
+    def call_upstream():
+        return scheduler.submit(
+            LLM_MODEL,
+            priority,
+            lambda: chat_model.invoke(prompt_value, config),
+            timeout=LLM_QUEUE_TIMEOUT
+        )
+
+    # Only deterministic calls can be shared
+    if LLM_TEMPERATURE != 0:
+        return call_upstream()
+
+    key = (LLM_MODEL, LLM_TEMPERATURE, tuple((message.type, message.content) for message in prompt_value.to_messages()))
+    return llm_flights.do(key, call_upstream)
+
+def get_llm(priority: int = PRIORITY_QA):
+    """
+    Return the chat model used by the workflow chains (`prompt | get_llm()`).
+
+    Args:
+        priority: Scheduling priority for calls through this handle; PRIORITY_APPLICATION
+            calls are admitted ahead of PRIORITY_ROUTING and PRIORITY_QA.
+    """
+    if priority not in _llms:
+        # A stateless wrapper; a duplicate from a racing first call is harmless
+        _llms.setdefault(priority, RunnableLambda(partial(_invoke_chat_model, priority=priority), name="ScheduledChatModel"))
+    return _llms[priority]
+
+def get_response_cache():
+    """Return the shared response cache, or None if caching is disabled."""
+    global _response_cache, _response_cache_failed
+    if _response_cache is None and not _response_cache_failed and LLM_CACHE_PATH and LLM_TEMPERATURE == 0:
+        with _init_lock:
+            if _response_cache is None and not _response_cache_failed:
+                try:
+                    _response_cache = ResponseCache(Path(LLM_CACHE_PATH), max_entries=LLM_CACHE_MAX_ENTRIES)
+                except (OSError, sqlite3.Error) as e:
+                    # e.g. a read-only volume; run uncached rather than failing every turn
+                    _response_cache_failed = True
+                    print(f"[WARN] Response cache disabled, could not open {LLM_CACHE_PATH}: {e}")
+    return _response_cache
+
+def cached_chain(prompt, priority: int = PRIORITY_QA):
+    """
+    Return `prompt | get_llm(priority)` with responses cached by template, input and model.
+
+    Use for extraction and classification prompts whose inputs repeat ("yes", "30",
+    "750"); a hit skips rendering, scheduling and the upstream call.
+    """
+    chain = prompt | get_llm(priority)
+    template = prompt.pretty_repr()
+
+    def invoke(inputs, config):
+        cache = get_response_cache()
+        if cache is None:
+            return chain.invoke(inputs, config)
+
+        key = ResponseCache.make_key(template, inputs, LLM_MODEL)
+        cached = cache.get(key)
+        if cached is not None:
+            return AIMessage(content=cached)
+
+        result = chain.invoke(inputs, config)
+        cache.put(key, result.content)
+        return result
+
+    return RunnableLambda(invoke, name="CachedChain")
+
+class CoalescedEmbeddings(Embeddings):
+    """Embeddings client that shares in-flight requests for identical text."""
+
+    def __init__(self, embeddings: Embeddings, model: str):
+        self.embeddings = embeddings
+        self.model = model
+
+    def embed_query(self, text: str) -> list[float]:
+        return embedding_flights.do((self.model, "query", text), lambda: self.embeddings.embed_query(text))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return embedding_flights.do((self.model, "documents", tuple(texts)), lambda: self.embeddings.embed_documents(texts))
+
+def get_embeddings() -> Embeddings:
+    """Return the shared embeddings client (must use same model as load_data.py)."""
+    global _embeddings
+    if _embeddings is None:
+        with _init_lock:
+            if _embeddings is None:
+                from langchain_openai import OpenAIEmbeddings
+                _embeddings = CoalescedEmbeddings(OpenAIEmbeddings(model=EMBEDDING_MODEL), EMBEDDING_MODEL)
+    return _embeddings
+
+def get_metrics() -> dict:
+    """Coalescing counters for the chat model and embeddings clients, scheduler queue and response cache metrics."""
+    cache = get_response_cache()
+    return {
+        "llm": llm_flights.metrics(),
+        "embeddings": embedding_flights.metrics(),
+        "scheduler": scheduler.metrics(),
+        "cache": cache.metrics() if cache is not None else None,
+    }
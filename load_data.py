@@ -1,10 +1,16 @@
+import argparse
+import json
 import os
 from pathlib import Path
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_chroma import Chroma
 from dotenv import load_dotenv
+from services.lexical_index import BM25Index
+from services.local_vector_index import LocalVectorIndex
+from services.faq_index import FAQIndex
 
 # Load environment variables
 load_dotenv()
@@ -12,6 +18,11 @@ load_dotenv()
 # Configuration
 DOCS_DIR = "docs"
 CHROMA_DB_DIR = "chroma_db"
+LEXICAL_INDEX_PATH = Path(CHROMA_DB_DIR) / "bm25_index.json"
+LOCAL_INDEX_DIR = Path(CHROMA_DB_DIR) / "local_index"
+FAQ_INDEX_PATH = Path(CHROMA_DB_DIR) / "faq_index.json"
+FAQ_MODEL = "gpt-4-turbo"
+FAQ_PAIRS_PER_DOC = 8
 CHUNK_SIZE = 512
 CHUNK_OVERLAP = 200
 
@@ -29,7 +40,9 @@ def split_documents(documents):
     """Split documents into chunks."""
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP
+        chunk_overlap=CHUNK_OVERLAP,
+        # Lets the retriever merge overlapping chunks back into contiguous passages
+        add_start_index=True
     )
     chunks = text_splitter.split_documents(documents)
     print(f"Split into {len(chunks)} chunks")
@@ -50,8 +63,108 @@ def create_vector_store(chunks):
     print(f"Persisted to {CHROMA_DB_DIR}")
     return vector_store
 
+def create_lexical_index(chunks):
+    """Build the BM25 keyword index over the same chunks and persist it next to Chroma."""
+    index = BM25Index(
+        texts=[chunk.page_content for chunk in chunks],
+        metadatas=[chunk.metadata for chunk in chunks]
+    )
+    index.save(LEXICAL_INDEX_PATH)
+
+    print(f"Created lexical index with {len(index.postings)} terms")
+    print(f"Persisted to {LEXICAL_INDEX_PATH}")
+    return index
+
+def create_local_index(vector_store):
+    """Export the Chroma embeddings to the memory-mapped local index (no extra embedding calls)."""
+    stored = vector_store.get(include=["embeddings", "documents", "metadatas"])
+    index = LocalVectorIndex.build(
+        LOCAL_INDEX_DIR,
+        embeddings=stored["embeddings"],
+        texts=stored["documents"],
+        metadatas=stored["metadatas"]
+    )
+
+    print(f"Created local vector index with {len(index.texts)} chunks{' (HNSW)' if index.hnsw else ''}")
+    print(f"Persisted to {LOCAL_INDEX_DIR}")
+    return index
+
+def generate_faq_pairs(document, chat_model) -> list[tuple[str, str]]:
+    """Ask the LLM for the questions a borrower would ask that the document answers, with answers from it."""
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", """You write FAQ entries for a mortgage lender's assistant from a company document.
+
+        Write up to {count} distinct questions a borrower would ask that the document fully answers,
+        each with a complete, self-contained answer that uses only facts from the document.
+
+        Return ONLY a JSON array: [{{"question": "...", "answer": "..."}}]
+
+        Document:
+        {document}"""),
+        ("human", "Write the FAQ entries.")
+    ])
+
+    chain = prompt | chat_model
+    result = chain.invoke({"document": document.page_content, "count": FAQ_PAIRS_PER_DOC})
+
+    response = result.content.strip().strip("`")
+    if response.startswith("json"):
+        response = response[4:]
+    try:
+        items = json.loads(response)
+    except json.JSONDecodeError:
+        print(f"Warning: Could not parse FAQ entries for {document.metadata['source']}")
+        return []
+
+    return [
+        (item["question"].strip(), item["answer"].strip())
+        for item in items
+        if isinstance(item, dict) and item.get("question") and item.get("answer")
+    ]
+
+def create_faq_index(documents):
+    """
+    Generate FAQ pairs for new or changed documents and persist the FAQ index.
+
+    Documents whose content is unchanged keep their entries and reviews; entries
+    for deleted documents are dropped. New entries are served once reviewed
+    (see review_faq.py).
+    """
+    try:
+        index = FAQIndex.load(FAQ_INDEX_PATH)
+    except FileNotFoundError:
+        index = FAQIndex()
+
+    documents_by_source = {document.metadata["source"]: document for document in documents}
+    for source in list(index.source_hashes):
+        if source not in documents_by_source:
+            index.remove_source(source)
+            print(f"Removed FAQ entries for deleted document {source}")
+
+    chat_model = ChatOpenAI(model=FAQ_MODEL, temperature=0)
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+
+    for source, document in documents_by_source.items():
+        if index.is_current(source, document.page_content):
+            continue
+        pairs = generate_faq_pairs(document, chat_model)
+        question_embeddings = embeddings.embed_documents([question for question, _ in pairs]) if pairs else []
+        index.replace_source(source, document.page_content, pairs, question_embeddings)
+        print(f"Generated {len(pairs)} FAQ entries for {source}")
+
+    index.save(FAQ_INDEX_PATH)
+
+    unreviewed = sum(1 for entry in index.entries if not entry.reviewed)
+    print(f"FAQ index has {len(index.entries)} entries ({unreviewed} awaiting review)")
+    print(f"Persisted to {FAQ_INDEX_PATH}")
+    return index
+
 def main():
     """Main function to load data into Chroma."""
+    parser = argparse.ArgumentParser(description="Ingest docs/ into the search and FAQ indexes.")
+    parser.add_argument("--faq-only", action="store_true", help="Only update the FAQ index for changed documents")
+    args = parser.parse_args()
+
     print("Starting data loading process...")
 
     documents = load_documents()
@@ -60,10 +173,18 @@ def main():
         print("No documents found. Exiting.")
         return
 
+    if args.faq_only:
+        create_faq_index(documents)
+        print("Data loading complete!")
+        return
+
     # we are splitting documents so we do not have a large chunk
     chunks = split_documents(documents)
 
-    create_vector_store(chunks)
+    vector_store = create_vector_store(chunks)
+    create_lexical_index(chunks)
+    create_local_index(vector_store)
+    create_faq_index(documents)
 
     print("Data loading complete!")
 
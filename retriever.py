@@ -1,26 +1,145 @@
-from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
-from dotenv import load_dotenv
+import os
+import threading
+from pathlib import Path
+from typing import Any, List, Optional
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from llm import get_embeddings
+from services.lexical_index import BM25Index, is_exact_term_query, reciprocal_rank_fusion
+from services.prefetcher import Prefetcher
+from services.faq_index import FAQIndex, FAQMatch
 
 # Load environment variables
-load_dotenv()
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
 
 # Configuration
 CHROMA_DB_DIR = "chroma_db"
+LEXICAL_INDEX_PATH = Path(CHROMA_DB_DIR) / "bm25_index.json"
+LOCAL_INDEX_DIR = Path(CHROMA_DB_DIR) / "local_index"
+FAQ_INDEX_PATH = Path(CHROMA_DB_DIR) / "faq_index.json"
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "chroma")  # "chroma" or "local"
+FETCH_K = 10  # candidates taken from each retriever before fusion
+KEYWORD_QUERY_MAX_TERMS = 3  # exact-term lookups this short are answered from the lexical index alone
+FAQ_MIN_SIMILARITY = float(os.getenv("FAQ_MIN_SIMILARITY", "0.9"))  # question similarity that counts as the same question
+PREFETCH_WORKERS = int(os.getenv("RETRIEVAL_PREFETCH_WORKERS", "8"))  # 0 disables speculative retrieval
 
-def get_retriever(k=3):
-    # Initialize embeddings (must use same model as load_data.py)
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+# Opened once per process and reused by every retriever
+_vector_store = None
+_lexical_index = None
+_lexical_index_checked = False
+_faq_index = None
+_faq_index_checked = False
 
-    # Load existing vector store
-    vector_store = Chroma(
-        persist_directory=CHROMA_DB_DIR,
-        embedding_function=embeddings
-    )
+# First calls can race between session threads and prefetch threads; each loader runs once
+_vector_store_lock = threading.Lock()
+_lexical_index_lock = threading.Lock()
+_faq_index_lock = threading.Lock()
+
+# Speculative retrievals started while the turn is still being classified
+prefetcher = Prefetcher(max_workers=PREFETCH_WORKERS)
+
+class LocalVectorStore:
+    """Adapts LocalVectorIndex to the similarity_search interface used by HybridRetriever."""
+
+    def __init__(self, index, embeddings):
+        self.index = index
+        self.embeddings = embeddings
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        query_embedding = self.embeddings.embed_query(query)
+        return [
+            Document(page_content=self.index.texts[doc_id], metadata=self.index.metadatas[doc_id])
+            for doc_id, _ in self.index.search(query_embedding, k=k)
+        ]
+
+def get_vector_store():
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                embeddings = get_embeddings()
+
+                if RETRIEVER_BACKEND == "local":
+                    from services.local_vector_index import LocalVectorIndex
+                    _vector_store = LocalVectorStore(LocalVectorIndex(LOCAL_INDEX_DIR), embeddings)
+                else:
+                    # Imported here so that importing this module does not pull in chromadb
+                    from langchain_chroma import Chroma
+
+                    # Load existing vector store
+                    _vector_store = Chroma(
+                        persist_directory=CHROMA_DB_DIR,
+                        embedding_function=embeddings
+                    )
+
+    return _vector_store
+
+def get_lexical_index() -> Optional[BM25Index]:
+    global _lexical_index, _lexical_index_checked
+    if not _lexical_index_checked:
+        with _lexical_index_lock:
+            if not _lexical_index_checked:
+                try:
+                    _lexical_index = BM25Index.load(LEXICAL_INDEX_PATH)
+                except FileNotFoundError:
+                    print(f"[WARN] No lexical index at {LEXICAL_INDEX_PATH}; re-run load_data.py. Using vector search only.")
+                # Only once the load is done, so no thread sees "checked" with the index still missing
+                _lexical_index_checked = True
+    return _lexical_index
+
+def get_faq_index() -> Optional[FAQIndex]:
+    global _faq_index, _faq_index_checked
+    if not _faq_index_checked:
+        with _faq_index_lock:
+            if not _faq_index_checked:
+                try:
+                    _faq_index = FAQIndex.load(FAQ_INDEX_PATH)
+                except FileNotFoundError:
+                    print(f"[INFO] No FAQ index at {FAQ_INDEX_PATH}; every question is answered live.")
+                _faq_index_checked = True
+    return _faq_index
+
+class HybridRetriever(BaseRetriever):
+    """Fuses BM25 keyword matches with Chroma similarity search using reciprocal-rank fusion."""
 
+    vector_store: Any
+    lexical_index: Optional[Any] = None
+    k: int = 3
+    fetch_k: int = FETCH_K
+
+    def _lexical_search(self, query: str) -> List[Document]:
+        if self.lexical_index is None:
+            return []
+        return [
+            Document(page_content=self.lexical_index.texts[doc_id], metadata=self.lexical_index.metadatas[doc_id])
+            for doc_id, _ in self.lexical_index.search(query, k=self.fetch_k)
+        ]
+
+    def _get_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        lexical_docs = self._lexical_search(query)
+
+        # Exact-term lookups ("FHA", "PMI", "DTI 43%") are answered without an embedding call;
+        # short questions in plain words still go through semantic search
+        if lexical_docs and is_exact_term_query(query, KEYWORD_QUERY_MAX_TERMS):
+            return lexical_docs[:self.k]
+
+        vector_docs = self.vector_store.similarity_search(query, k=self.fetch_k)
+        fused = reciprocal_rank_fusion(
+            [vector_docs, lexical_docs],
+            key=lambda doc: (doc.metadata.get("source"), doc.page_content)
+        )
+        return fused[:self.k]
+
+def get_retriever(k=3):
     # Create retriever
-    retriever = vector_store.as_retriever(
-        search_kwargs={"k": k}
+    retriever = HybridRetriever(
+        vector_store=get_vector_store(),
+        lexical_index=get_lexical_index(),
+        k=k
     )
 
     return retriever
@@ -29,3 +148,36 @@ def search_documents(query, k=3):
     retriever = get_retriever(k=k)
     documents = retriever.invoke(query)
     return documents
+
+def prefetch_documents(query, k=3) -> Optional[str]:
+    """
+    Start retrieving documents for a query in the background.
+
+    Returns:
+        A key for take_prefetched_documents() or discard_prefetch(), or None if prefetching is disabled.
+    """
+    return prefetcher.start(lambda: search_documents(query, k=k))
+
+def take_prefetched_documents(prefetch_id: Optional[str]) -> Optional[List[Document]]:
+    """Return the documents of a prefetch, waiting if it is still running; None if there is none."""
+    return prefetcher.take(prefetch_id)
+
+def discard_prefetch(prefetch_id: Optional[str]) -> None:
+    """Drop a prefetch whose turn did not need retrieval."""
+    prefetcher.discard(prefetch_id)
+
+def match_faq(query) -> Optional[FAQMatch]:
+    """Find a reviewed FAQ answer for a question asked in other words, if one is close enough."""
+    index = get_faq_index()
+    if index is None or not any(entry.reviewed for entry in index.entries):
+        # Nothing to serve, so skip the embedding call
+        return None
+    return index.match(get_embeddings().embed_query(query), FAQ_MIN_SIMILARITY)
+
+def prefetch_faq(query) -> Optional[str]:
+    """Start matching a question against the FAQ index in the background; see prefetch_documents()."""
+    return prefetcher.start(lambda: match_faq(query))
+
+def take_prefetched_faq(prefetch_id: Optional[str]) -> Optional[FAQMatch]:
+    """Return the FAQ match of a prefetch, waiting if it is still running; None if there is none."""
+    return prefetcher.take(prefetch_id)
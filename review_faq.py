@@ -0,0 +1,58 @@
+"""
+Review generated FAQ answers before they are served.
+
+Usage:
+    python review_faq.py                # approve, edit, reject or skip each unreviewed entry
+    python review_faq.py --list         # show every entry and its review status
+    python review_faq.py --approve-all  # approve every unreviewed entry
+"""
+import argparse
+from retriever import FAQ_INDEX_PATH
+from services.faq_index import FAQIndex
+
+def main():
+    parser = argparse.ArgumentParser(description="Review generated FAQ answers.")
+    parser.add_argument("--list", action="store_true", help="List entries and exit")
+    parser.add_argument("--approve-all", action="store_true", help="Approve every unreviewed entry")
+    args = parser.parse_args()
+
+    try:
+        index = FAQIndex.load(FAQ_INDEX_PATH)
+    except FileNotFoundError:
+        print(f"No FAQ index at {FAQ_INDEX_PATH}. Run load_data.py first.")
+        return
+
+    if args.list:
+        for entry in index.entries:
+            print(f"[{'x' if entry.reviewed else ' '}] {entry.source}: {entry.question}")
+        return
+
+    pending = [entry for entry in index.entries if not entry.reviewed]
+    if args.approve_all:
+        for entry in pending:
+            entry.reviewed = True
+        index.save(FAQ_INDEX_PATH)
+        print(f"Approved {len(pending)} entries")
+        return
+
+    rejected = set()
+    for i, entry in enumerate(pending, 1):
+        print(f"\n[{i}/{len(pending)}] {entry.source}\nQ: {entry.question}\nA: {entry.answer}")
+        choice = input("(a)pprove, (e)dit, (r)eject, (s)kip, (q)uit? ").strip().lower()
+        if choice == "a":
+            entry.reviewed = True
+        elif choice == "e":
+            entry.answer = input("New answer: ").strip() or entry.answer
+            entry.reviewed = True
+        elif choice == "r":
+            rejected.add(id(entry))
+        elif choice == "q":
+            break
+
+    # Rejected entries are dropped; they come back only if their document changes
+    index.entries = [entry for entry in index.entries if id(entry) not in rejected]
+    index.save(FAQ_INDEX_PATH)
+    print(f"\nSaved. {sum(1 for e in index.entries if not e.reviewed)} entries still awaiting review.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Pre-fork HTTP server for the loan officer workflow.
+
+The parent loads the read-only resources (rate sheet, keyword and FAQ indexes,
+the local vector index when RETRIEVER_BACKEND=local, and the compiled graph)
+once, then forks worker processes that share those pages copy-on-write and
+accept connections on the same listening socket. Clients that hold network
+connections or threads (the OpenAI clients, the Chroma client) are opened in
+each worker after the fork, since they do not survive one.
+
+The server is stateless: the client sends the conversation state with each
+message and gets the updated state back. Only the borrower's answers and the
+current step are read from it, and they are validated like any other answer.
+
+Usage:
+    python server.py --workers 4 --port 8000
+
+Endpoints:
+    POST /chat    {"message": "...", "state": {...} | null} -> {"response": "...", "state": {...}}
+                  (503 with the state unchanged when the upstream queue is full)
+    GET  /health  {"status": "ok", "worker": 0, "pid": 1234, ...} from whichever worker accepts
+"""
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    # Optional here: settings can come from the environment directly (e.g. compose env_file)
+    pass
+
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import retriever
+from retriever import get_lexical_index, get_faq_index, get_vector_store
+from services.application_parser import APPLICATION_FIELDS, is_valid_field
+from services.upstream_scheduler import UpstreamBusyError
+from workflow import BUSY_RESPONSE, AgentState, application_fields, get_workflow, initial_state, warm_up
+
+DEFAULT_WORKERS = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+DEFAULT_PORT = int(os.getenv("SERVER_PORT", "8000"))
+MAX_BODY_BYTES = 1_000_000
+RESTART_DELAY = 1.0  # seconds before replacing a worker that died
+
+# Per-turn data that is not part of the conversation state sent back to clients
+TRANSIENT_FIELDS = ("retrieved_docs", "prefetch_id", "faq_prefetch_id")
+
+# Application steps a client may resume at; anything else starts over in Q&A mode
+APPLICATION_STEPS = set(APPLICATION_FIELDS) | {"subprime_confirmation", "calculate_rate"}
+INTEGER_FIELDS = ("credit_score", "home_value", "down_payment", "income", "loan_term")
+
+# Set in each worker after the fork
+_worker_index: Optional[int] = None
+_started_at = 0.0
+_requests_served = 0
+
+def preload():
+    """Load the read-only resources in the parent so every worker shares one copy."""
+    from tools.rate_tool import get_rate_calculator
+
+    get_rate_calculator()
+    get_lexical_index()
+    get_faq_index()
+    if retriever.RETRIEVER_BACKEND == "local":
+        # A memory-mapped matrix, shared through the page cache either way
+        get_vector_store()
+    get_workflow()
+
+    # Move everything loaded so far out of the collector's reach, so collections in
+    # the workers don't write to (and un-share) the pages holding these objects
+    gc.collect()
+    gc.freeze()
+
+def public_state(state: dict) -> dict:
+    """The conversation state as sent to clients: JSON-safe, without per-turn data."""
+    state = dict(state)
+    for field in TRANSIENT_FIELDS:
+        state[field] = None
+    state["messages"] = []
+    return state
+
+def restore_state(client_state: Optional[dict]) -> AgentState:
+    """
+    Rebuild the conversation state from what the client sent back, without trusting it.
+
+    Only the borrower's answers and the current step are taken, and only if they
+    pass the same checks as answers given in the conversation. Derived fields (loan
+    amount, rate, context, responses) are never accepted; the loan amount is recomputed.
+    The step is resumed where the workflow itself would be: the first unanswered
+    question, the rate once every answer is in, or the subprime confirmation only
+    while a score below 620 is awaiting it. Any other step the client sends
+    (including one whose earlier answers are missing) is replaced by that.
+    """
+    state = initial_state()
+    if not client_state:
+        return state
+
+    for field in APPLICATION_FIELDS + ["down_payment_percent"]:
+        value = client_state.get(field)
+        if value is not None and is_valid_field(field, value):
+            state[field] = int(value) if field in INTEGER_FIELDS else value
+    if isinstance(client_state.get("subprime_continue"), bool):
+        state["subprime_continue"] = client_state["subprime_continue"]
+    if state["home_value"] is not None and state["down_payment"] is not None:
+        state["loan_amount"] = state["home_value"] - state["down_payment"]
+
+    step = client_state.get("application_step")
+    if step not in APPLICATION_STEPS:
+        return state
+    awaiting_subprime = (
+        state["credit_score"] is not None and state["credit_score"] < 620 and state["subprime_continue"] is None
+    )
+    if not (step == "subprime_confirmation" and awaiting_subprime):
+        missing = [field for field in application_fields() if state[field] is None]
+        step = missing[0] if missing else "calculate_rate"
+    state["mode"] = "application"
+    state["application_step"] = step
+    return state
+
+def run_turn(message: str, client_state: Optional[dict]) -> dict:
+    """Run one message through the workflow, starting from the state the client sent back."""
+    state = restore_state(client_state)
+    state["user_input"] = message
+
+    result = get_workflow().invoke(state)
+
+    if result.get("application_step") == "ended":
+        # Same reset as the Streamlit app: the next message starts a new conversation turn
+        result["application_step"] = None
+        result["mode"] = "qa"
+    return result
+
+class ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, body: dict) -> None:
+        payload = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        self._send_json(200, {
+            "status": "ok",
+            "worker": _worker_index,
+            "pid": os.getpid(),
+            "uptime_s": round(time.monotonic() - _started_at, 1),
+            "requests": _requests_served,
+        })
+
+    def do_POST(self):
+        global _requests_served
+        if self.path != "/chat":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            # The body can't be framed, so don't read it or reuse the connection
+            self.close_connection = True
+            self._send_json(400, {"error": "invalid Content-Length"})
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "request too large"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            message = body["message"]
+            client_state = body.get("state")
+            if not isinstance(message, str) or not (client_state is None or isinstance(client_state, dict)):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": 'expected {"message": str, "state": object | null}'})
+            return
+
+        try:
+            result = run_turn(message, client_state)
+        except UpstreamBusyError as e:
+            # Queue full or not admitted in time; the client's state is unchanged, so it can resend
+            self._send_json(503, {"error": str(e), "response": BUSY_RESPONSE, "state": client_state})
+            return
+        except Exception as e:
+            print(f"[ERROR] Worker {_worker_index}: {e!r}")
+            self._send_json(500, {"error": "internal error"})
+            return
+
+        _requests_served += 1
+        self._send_json(200, {"response": result.get("final_response"), "state": public_state(result)})
+
+    def log_message(self, format, *args):
+        if os.getenv("SERVER_ACCESS_LOG"):
+            super().log_message(format, *args)
+
+def run_worker(index: int, listener: socket.socket) -> None:
+    """Serve requests from the shared listening socket until terminated."""
+    global _worker_index, _started_at
+    _worker_index = index
+    _started_at = time.monotonic()
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    # Clients that can't cross a fork: chat model, Chroma (unless preloaded), etc.
+    warm_up()
+
+    server = ThreadingHTTPServer(listener.getsockname()[:2], ChatHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = listener
+    server.daemon_threads = True
+    print(f"[INFO] Worker {index} (pid {os.getpid()}) ready")
+    server.serve_forever()
+
+def serve(host: str = "0.0.0.0", port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS) -> None:
+    """Preload shared resources, fork the workers and restart any that die."""
+    preload()
+
+    listener = socket.create_server((host, port), backlog=1024)
+    print(f"[INFO] Listening on http://{host}:{port} with {workers} workers")
+
+    children: dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(index, listener)
+            finally:
+                os._exit(1)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            print(f"[WARN] Worker {index} (pid {pid}) exited with status {status}; restarting")
+            # Don't spin if workers fail on startup
+            time.sleep(RESTART_DELAY)
+            spawn(index)
+
+    listener.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the loan officer workflow over HTTP with pre-forked workers.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
+
+if __name__ == "__main__":
+    main()
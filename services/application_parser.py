@@ -0,0 +1,230 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Answers accepted for the product and occupancy steps, matched by keyword
+LOAN_PRODUCTS = {
+    "conventional": ["conventional", "conforming"],
+    "fha": ["fha"],
+    "jumbo": ["jumbo"],
+}
+# Matched on word boundaries; no generic words like "residence", so "second residence" is not primary
+OCCUPANCY_TYPES = {
+    "primary": ["primary", "main home", "main residence", "live in", "owner occupied", "owner-occupied"],
+    "second_home": ["second", "vacation"],
+    "investment": ["investment", "rental", "rent"],
+}
+
+# Occupancy phrases specific enough to pick out of a longer message ("I currently rent" is not a rental)
+OCCUPANCY_PHRASES = {
+    "primary": ["primary residence", "primary home", "live in it", "owner occupied", "owner-occupied"],
+    "second_home": ["second home", "vacation home"],
+    "investment": ["investment property", "rental property", "as a rental", "to rent out"],
+}
+
+# Fields in the order the application asks for them
+APPLICATION_FIELDS = ["credit_score", "home_value", "down_payment", "income", "debts", "loan_term", "product", "occupancy"]
+
+LOAN_TERMS = (15, 30)
+MIN_CREDIT_SCORE, MAX_CREDIT_SCORE = 300, 850
+# Smallest plausible values, so "a home 30 year fixed" is not read as a $30 home
+MIN_HOME_VALUE = 10_000
+MIN_INCOME = 1_000
+
+_AMOUNT = r"\$?\s?(?P<amount>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)\s?(?P<unit>k|m|mil|thousand|million)?\b"
+_PERCENT = r"(?P<percent>\d+(?:\.\d+)?)\s?(?:%|percent\b)"
+_FILLER = r"(?:\s*(?:is|are|of|at|for|about|around|roughly|approximately|actually|now|worth|costs?|priced at|valued at|maybe|[:=~]))*\s*"
+_MONTHLY = r"\s*(?:a|per|/|each)\s*(?:month|mo)\b|\s*monthly\b"
+_YEARLY = r"\s*(?:a|per|/|each)\s*(?:year|yr)\b|\s*(?:annually|yearly)\b"
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+# Labelled mentions of each numeric field, most specific first; the first unclaimed match wins
+_PATTERNS = {
+    "loan_term": [
+        r"\b(?P<amount>15|30)[\s-]*(?:years?|yrs?)[\s-]*(?:fixed|loan|mortgage|term)\b",
+        r"\b(?:fixed|loan|mortgage)(?:\s+(?:for|of|over))?\s+(?P<amount>15|30)[\s-]*(?:years?|yrs?)\b",
+        rf"term{_FILLER}(?P<amount>15|30)\b",
+    ],
+    "credit_score": [
+        rf"(?:credit(?:\s+score)?|fico|score){_FILLER}(?P<amount>\d{{3}})\b",
+        r"\b(?P<amount>\d{3})\s*(?:credit(?:\s+score)?|fico|score)",
+    ],
+    "down_payment": [
+        rf"{_PERCENT}\s*down\b",
+        rf"down(?:\s*payment)?{_FILLER}{_PERCENT}",
+        rf"{_AMOUNT}\s*down\b",
+        rf"down(?:\s*payment)?{_FILLER}{_AMOUNT}",
+    ],
+    "debts": [
+        rf"(?:debts?|debt payments?|obligations|car payment|student loans?)(?:\s+payments?)?{_FILLER}{_AMOUNT}",
+        rf"{_AMOUNT}(?:{_MONTHLY})?\s*(?:in\s+)?(?:monthly\s+)?(?:debts?|debt payments?|obligations)\b",
+    ],
+    "income": [
+        rf"(?:income|salary|make|making|earn|earning)s?{_FILLER}{_AMOUNT}(?P<period>{_MONTHLY}|{_YEARLY})?",
+        rf"{_AMOUNT}(?P<period>{_MONTHLY}|{_YEARLY})?\s*(?:(?:in\s+)?(?:annual|yearly|household)?\s*(?:income|salary))",
+        rf"{_AMOUNT}(?P<period>{_YEARLY})",
+    ],
+    "home_value": [
+        rf"(?:home|house|property|condo|purchase)(?:\s+(?:value|price))?{_FILLER}{_AMOUNT}",
+        rf"(?:price|value){_FILLER}{_AMOUNT}",
+        rf"{_AMOUNT}\s*(?:home|house|property|condo|place)\b",
+    ],
+}
+# Unlabelled mentions only attributed when that field was just asked for ("been at my job 15 years" is not a term)
+_EXPECTED_PATTERNS = {
+    "loan_term": [r"\b(?P<amount>15|30)[\s-]*(?:years?|yrs?)\b"],
+}
+_COMPILED = {name: [re.compile(p, re.IGNORECASE) for p in patterns] for name, patterns in _PATTERNS.items()}
+_COMPILED_EXPECTED = {name: [re.compile(p, re.IGNORECASE) for p in patterns] for name, patterns in _EXPECTED_PATTERNS.items()}
+
+# Wording that marks a message as changing an earlier answer
+_CORRECTION = re.compile(r"\b(?:actually|correction|i meant|meant to say|change|update|instead|mistake|typo|wrong)\b", re.IGNORECASE)
+
+
+@dataclass
+class ParsedApplication:
+    """
+    Application fields found in a message by local parsing.
+
+    Attributes:
+        fields: Field name to value. A percentage down payment is reported as
+            down_payment_percent, since the dollar amount depends on the home value.
+        leftover: Numbers in the message no field claimed.
+    """
+    fields: dict = field(default_factory=dict)
+    leftover: list[str] = field(default_factory=list)
+
+
+def match_choice(text: str, choices: dict) -> Optional[str]:
+    """Return the first choice with a keyword in the text."""
+    text = text.lower()
+    for value, keywords in choices.items():
+        if any(re.search(rf"\b{re.escape(keyword)}\b", text) for keyword in keywords):
+            return value
+    return None
+
+
+def is_correction(text: str) -> bool:
+    """Whether the borrower is changing an answer they already gave ("actually my score is 700")."""
+    return _CORRECTION.search(text) is not None
+
+
+def _to_amount(match: re.Match) -> float:
+    value = float(match.group("amount").replace(",", ""))
+    unit = (match.groupdict().get("unit") or "").lower()
+    if unit in ("k", "thousand"):
+        value *= 1_000
+    elif unit in ("m", "mil", "million"):
+        value *= 1_000_000
+    return value
+
+
+def is_valid_field(name: str, value) -> bool:
+    """Whether a value is plausible for an application field, however it was extracted."""
+    if name == "product":
+        return value in LOAN_PRODUCTS
+    if name == "occupancy":
+        return value in OCCUPANCY_TYPES
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    if name == "credit_score":
+        return MIN_CREDIT_SCORE <= value <= MAX_CREDIT_SCORE
+    if name == "loan_term":
+        return value in LOAN_TERMS
+    if name == "home_value":
+        return value >= MIN_HOME_VALUE
+    if name == "income":
+        return value >= MIN_INCOME
+    if name == "down_payment_percent":
+        return 0 <= value <= 100
+    if name in ("down_payment", "debts"):
+        return value >= 0
+    return False
+
+
+def _valid(fields: dict) -> bool:
+    return all(is_valid_field(name, value) for name, value in fields.items())
+
+
+def _overlaps(span: tuple[int, int], claimed: list[tuple[int, int]]) -> bool:
+    return any(span[0] < end and start < span[1] for start, end in claimed)
+
+
+def _store(fields: dict, name: str, match: re.Match) -> None:
+    groups = match.groupdict()
+    if groups.get("percent"):
+        fields["down_payment_percent"] = float(groups["percent"])
+        return
+    value = _to_amount(match)
+    period = (groups.get("period") or "").lower()
+    if name == "income" and "mo" in period:
+        value *= 12
+    if name in ("credit_score", "home_value", "income", "loan_term", "down_payment"):
+        value = int(value)
+    fields[name] = value
+
+
+def parse_application(text: str, expected: Optional[str] = None) -> ParsedApplication:
+    """
+    Picks out every application field stated in a message without calling a model.
+
+    Labelled mentions ("750 score", "$400k house", "20% down", "$120k income") are
+    attributed to their field wherever they appear. A bare answer ("750", "$80,000",
+    "20%") is attributed to the field the borrower was just asked for.
+
+    Args:
+        text: The borrower's message.
+        expected: The field the borrower was just asked for, if any.
+
+    Returns:
+        The fields found and any numbers left unattributed.
+    """
+    fields: dict = {}
+    claimed: list[tuple[int, int]] = []
+
+    for name, patterns in _COMPILED.items():
+        if name == expected:
+            patterns = patterns + _COMPILED_EXPECTED.get(name, [])
+        for pattern in patterns:
+            match = next((m for m in pattern.finditer(text) if not _overlaps(m.span(), claimed)), None)
+            if match is None:
+                continue
+            candidate: dict = {}
+            _store(candidate, name, match)
+            if not _valid(candidate):
+                continue
+            fields.update(candidate)
+            claimed.append(match.span())
+            break
+
+    product = match_choice(text, LOAN_PRODUCTS)
+    if product is not None:
+        fields["product"] = product
+    occupancy = match_choice(text, OCCUPANCY_TYPES if expected == "occupancy" else OCCUPANCY_PHRASES)
+    if occupancy is not None:
+        fields["occupancy"] = occupancy
+
+    found_expected = expected in fields or (expected == "down_payment" and "down_payment_percent" in fields)
+    if expected in _PATTERNS and not found_expected:
+        _parse_bare_answer(text, expected, fields, claimed)
+
+    leftover = [m.group() for m in _NUMBER.finditer(text) if not _overlaps(m.span(), claimed)]
+    return ParsedApplication(fields=fields, leftover=leftover)
+
+
+def _parse_bare_answer(text: str, expected: str, fields: dict, claimed: list[tuple[int, int]]) -> None:
+    """Attribute a lone unlabelled number to the field that was asked for."""
+    pattern = rf"{_PERCENT}|{_AMOUNT}" if expected == "down_payment" else _AMOUNT
+    if expected == "income":
+        pattern += rf"(?P<period>{_MONTHLY}|{_YEARLY})?"
+    matches = [m for m in re.finditer(pattern, text, re.IGNORECASE) if not _overlaps(m.span(), claimed)]
+    if len(matches) != 1:
+        # Nothing to attribute, or several candidates we can't tell apart
+        return
+
+    candidate: dict = {}
+    _store(candidate, expected, matches[0])
+    if not _valid(candidate):
+        return
+    fields.update(candidate)
+    claimed.append(matches[0].span())
@@ -0,0 +1,160 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+CHARS_PER_TOKEN = 4  # rough average for OpenAI tokenizers on English text
+MIN_OVERLAP_CHARS = 20  # shortest text overlap treated as a split boundary rather than coincidence
+MAX_ADJACENT_GAP = 2  # chunks separated by at most this many characters are joined
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the prompt tokens for a piece of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+@dataclass
+class Passage:
+    """A contiguous span of one source document, built from one or more chunks."""
+    text: str
+    source: Optional[str]
+    rank: int  # best relevance rank of the chunks merged into it
+    start: Optional[int] = None
+
+    @property
+    def end(self) -> Optional[int]:
+        return None if self.start is None else self.start + len(self.text)
+
+@dataclass
+class AssembledContext:
+    """
+    The context sent to the answer prompts, with token accounting.
+
+    Attributes:
+        text: The assembled context.
+        passages: The passages included, most relevant first.
+        raw_tokens: Tokens the chunks would have cost if joined as-is.
+        context_tokens: Tokens of the assembled context.
+    """
+    text: str
+    passages: list[Passage] = field(default_factory=list)
+    raw_tokens: int = 0
+    context_tokens: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.raw_tokens - self.context_tokens
+
+def _merge_by_position(a: Passage, b: Passage) -> Optional[str]:
+    first, second = (a, b) if a.start <= b.start else (b, a)
+    gap = second.start - first.end
+    if gap > MAX_ADJACENT_GAP:
+        return None
+    if second.end <= first.end:
+        return first.text
+    if gap > 0:
+        return first.text + "\n" + second.text
+    return first.text + second.text[first.end - second.start:]
+
+def _merge_by_text(a: Passage, b: Passage) -> Optional[str]:
+    if b.text in a.text:
+        return a.text
+    if a.text in b.text:
+        return b.text
+
+    for first, second in ((a.text, b.text), (b.text, a.text)):
+        # Look for second's opening in first; the split overlap runs from there to the end of first
+        head = second[:MIN_OVERLAP_CHARS]
+        index = first.find(head)
+        while index != -1:
+            if second.startswith(first[index:]):
+                return first + second[len(first) - index:]
+            index = first.find(head, index + 1)
+    return None
+
+def _merge(a: Passage, b: Passage) -> Optional[Passage]:
+    """Joins two passages of the same source if they overlap or touch."""
+    if a.source != b.source:
+        return None
+
+    if a.start is not None and b.start is not None:
+        text = _merge_by_position(a, b)
+        start = min(a.start, b.start)
+    else:
+        text = _merge_by_text(a, b)
+        start = None
+
+    if text is None:
+        return None
+    return Passage(text=text, source=a.source, rank=min(a.rank, b.rank), start=start)
+
+def _normalize(paragraph: str) -> str:
+    return re.sub(r"\s+", " ", paragraph).strip().lower()
+
+def assemble_context(docs: list, token_budget: int) -> AssembledContext:
+    """
+    Merges overlapping chunks, removes repeated text and packs the result to a token budget.
+
+    Args:
+        docs: Retrieved documents (anything with page_content and metadata), most relevant first.
+        token_budget: The maximum number of tokens of context to return.
+
+    Returns:
+        An AssembledContext with the packed text and the tokens saved.
+    """
+    raw_tokens = estimate_tokens("\n\n".join(doc.page_content for doc in docs))
+
+    # Merge chunks from the same source that overlap or are adjacent
+    passages: list[Passage] = []
+    for rank, doc in enumerate(docs):
+        passage = Passage(
+            text=doc.page_content,
+            source=doc.metadata.get("source"),
+            rank=rank,
+            start=doc.metadata.get("start_index"),
+        )
+        merged = True
+        while merged:
+            merged = False
+            for i, existing in enumerate(passages):
+                combined = _merge(existing, passage)
+                if combined is not None:
+                    passage = combined
+                    del passages[i]
+                    merged = True
+                    break
+        passages.append(passage)
+
+    passages.sort(key=lambda p: p.rank)
+
+    # Drop paragraphs already included from a more relevant passage (e.g. shared boilerplate across docs)
+    seen: set[str] = set()
+    deduped: list[Passage] = []
+    for passage in passages:
+        paragraphs = []
+        for paragraph in re.split(r"\n\s*\n", passage.text):
+            key = _normalize(paragraph)
+            if key and key not in seen:
+                seen.add(key)
+                paragraphs.append(paragraph.strip())
+        if paragraphs:
+            deduped.append(Passage(text="\n\n".join(paragraphs), source=passage.source, rank=passage.rank, start=passage.start))
+
+    # Pack by relevance; skip passages that do not fit, truncating only if nothing fits
+    packed: list[Passage] = []
+    used = 0
+    for passage in deduped:
+        tokens = estimate_tokens(passage.text) + (1 if packed else 0)
+        if used + tokens <= token_budget:
+            packed.append(passage)
+            used += tokens
+        elif not packed:
+            truncated = passage.text[:token_budget * CHARS_PER_TOKEN]
+            packed.append(Passage(text=truncated, source=passage.source, rank=passage.rank, start=passage.start))
+            break
+
+    text = "\n\n".join(passage.text for passage in packed)
+    return AssembledContext(
+        text=text,
+        passages=packed,
+        raw_tokens=raw_tokens,
+        context_tokens=estimate_tokens(text),
+    )
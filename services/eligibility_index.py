@@ -0,0 +1,131 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class Eligibility:
+    """
+    The nearest qualifying tier for a declined application, changing one factor at a time.
+
+    Attributes:
+        max_ltv: The highest LTV that qualifies at the same credit score and DTI.
+        max_dti: The highest DTI that qualifies at the same credit score and LTV.
+        min_credit: The lowest credit score that qualifies at the same LTV and DTI.
+    """
+    max_ltv: Optional[float] = None
+    max_dti: Optional[float] = None
+    min_credit: Optional[int] = None
+
+class _TermIndex:
+    """
+    Qualifying regions of the rate matrix for a single loan term.
+
+    Each grid is indexed by the tier positions of the two factors held fixed and
+    holds the best value of the third factor over every row that covers the cell,
+    so a lookup is two bisects and a list access.
+    """
+    def __init__(self, rows: list[dict]):
+        self.credit_tiers = sorted({row["min_credit"] for row in rows})
+        self.ltv_levels = sorted({row["max_ltv"] for row in rows})
+        self.dti_levels = sorted({row["max_dti"] for row in rows})
+
+        n_credit, n_ltv, n_dti = len(self.credit_tiers), len(self.ltv_levels), len(self.dti_levels)
+        self.max_ltv = [[None] * n_dti for _ in range(n_credit)]
+        self.max_dti = [[None] * n_ltv for _ in range(n_credit)]
+        self.min_credit = [[None] * n_dti for _ in range(n_ltv)]
+
+        credit_pos = {value: i for i, value in enumerate(self.credit_tiers)}
+        ltv_pos = {value: i for i, value in enumerate(self.ltv_levels)}
+        dti_pos = {value: i for i, value in enumerate(self.dti_levels)}
+
+        for row in rows:
+            c = credit_pos[row["min_credit"]]
+            l = ltv_pos[row["max_ltv"]]
+            d = dti_pos[row["max_dti"]]
+            self.max_ltv[c][d] = _merge(max, self.max_ltv[c][d], row["max_ltv"])
+            self.max_dti[c][l] = _merge(max, self.max_dti[c][l], row["max_dti"])
+            self.min_credit[l][d] = _merge(min, self.min_credit[l][d], row["min_credit"])
+
+        # A row is available to every higher credit score and to every lower LTV/DTI,
+        # so spread each cell upwards along credit and downwards along LTV/DTI.
+        for grid in (self.max_ltv, self.max_dti):
+            _spread_down(grid, max)
+            _spread_left(grid, max)
+        _spread_up(self.min_credit, min)
+        _spread_left(self.min_credit, min)
+
+    def nearest(self, credit_score: int, ltv: float, dti: float) -> Eligibility:
+        c = bisect_right(self.credit_tiers, credit_score) - 1
+        l = bisect_left(self.ltv_levels, ltv)
+        d = bisect_left(self.dti_levels, dti)
+
+        has_credit = c >= 0
+        has_ltv = l < len(self.ltv_levels)
+        has_dti = d < len(self.dti_levels)
+
+        return Eligibility(
+            max_ltv=self.max_ltv[c][d] if has_credit and has_dti else None,
+            max_dti=self.max_dti[c][l] if has_credit and has_ltv else None,
+            min_credit=self.min_credit[l][d] if has_ltv and has_dti else None,
+        )
+
+def _spread_down(grid: list[list], pick) -> None:
+    """Carry each cell into the rows after it (row i sees rows 0..i)."""
+    for i in range(1, len(grid)):
+        grid[i] = [_merge(pick, a, b) for a, b in zip(grid[i], grid[i - 1])]
+
+def _spread_up(grid: list[list], pick) -> None:
+    """Carry each cell into the rows before it (row i sees rows i..n)."""
+    for i in range(len(grid) - 2, -1, -1):
+        grid[i] = [_merge(pick, a, b) for a, b in zip(grid[i], grid[i + 1])]
+
+def _spread_left(grid: list[list], pick) -> None:
+    """Carry each cell into the columns before it (column j sees columns j..n)."""
+    for row in grid:
+        for j in range(len(row) - 2, -1, -1):
+            row[j] = _merge(pick, row[j], row[j + 1])
+
+def _merge(pick, a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return pick(a, b)
+
+class EligibilityIndex:
+    """
+    An index over the qualifying regions of the rate matrix, per loan term.
+
+    Answers "what is the closest tier this application would qualify for" without
+    rescanning the matrix, so declined applications can be told what to change.
+    """
+    def __init__(self, rate_matrix: list[dict]):
+        """
+        Builds the per-term grids from the loaded rate matrix.
+
+        Args:
+            rate_matrix: The rows loaded by RateCalculator.
+        """
+        rows_by_term: dict[int, list[dict]] = {}
+        for row in rate_matrix:
+            rows_by_term.setdefault(row["loan_term"], []).append(row)
+        self._terms = {term: _TermIndex(rows) for term, rows in rows_by_term.items()}
+
+    def nearest(self, credit_score: int, ltv: float, dti: float, loan_term: int) -> Optional[Eligibility]:
+        """
+        Finds the qualifying limits for each factor, holding the other two fixed.
+
+        Args:
+            credit_score: The user's credit score.
+            ltv: The loan-to-value ratio.
+            dti: The debt-to-income ratio.
+            loan_term: The loan term in years.
+
+        Returns:
+            An Eligibility with a limit for each factor that can be adjusted to qualify,
+            or None if the loan term is not offered.
+        """
+        term_index = self._terms.get(loan_term)
+        if term_index is None:
+            return None
+        return term_index.nearest(credit_score, ltv, dti)
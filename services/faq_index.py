@@ -0,0 +1,137 @@
+import hashlib
+import json
+import math
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Optional
+
+@dataclass
+class FAQEntry:
+    """
+    A canonical question and answer generated from one source document.
+
+    Attributes:
+        question: The question as a borrower would ask it.
+        answer: The answer, taken from the source document.
+        source: The document the pair was generated from.
+        embedding: The normalized embedding of the question.
+        reviewed: Whether a person has approved the answer; only reviewed answers are served.
+    """
+    question: str
+    answer: str
+    source: str
+    embedding: list[float] = field(repr=False)
+    reviewed: bool = False
+
+@dataclass
+class FAQMatch:
+    """A FAQ entry matched to a user question, with the cosine similarity of the two questions."""
+    entry: FAQEntry
+    similarity: float
+
+def source_hash(text: str) -> str:
+    """Content hash of a source document, used to detect which documents changed."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _normalize(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+class FAQIndex:
+    """
+    Precomputed question/answer pairs per source document, searched by question embedding.
+
+    Entries are grouped by source with the hash of the document they were generated
+    from, so an ingestion run only regenerates pairs for documents that changed.
+    The index holds a few dozen entries per document, so search is an exact
+    dot product over normalized embeddings.
+    """
+    def __init__(self, entries: Optional[list[FAQEntry]] = None, source_hashes: Optional[dict[str, str]] = None):
+        """
+        Args:
+            entries: The FAQ entries.
+            source_hashes: Source document to the hash of the content its entries were generated from.
+        """
+        self.entries = entries or []
+        self.source_hashes = source_hashes or {}
+
+    def is_current(self, source: str, text: str) -> bool:
+        """Whether the entries for source were generated from this exact text."""
+        return self.source_hashes.get(source) == source_hash(text)
+
+    def replace_source(self, source: str, text: str, pairs: list[tuple[str, str]], embeddings: list[list[float]]) -> None:
+        """
+        Replaces every entry for a source with freshly generated, unreviewed pairs.
+
+        A pair whose question and answer are unchanged keeps its review.
+
+        Args:
+            source: The source document.
+            text: The document content the pairs were generated from.
+            pairs: (question, answer) pairs.
+            embeddings: One embedding per question.
+        """
+        if len(pairs) != len(embeddings):
+            raise ValueError(f"Expected {len(pairs)} embeddings, got {len(embeddings)}")
+
+        reviewed = {(e.question, e.answer) for e in self.entries if e.source == source and e.reviewed}
+        self.remove_source(source)
+        for (question, answer), embedding in zip(pairs, embeddings):
+            self.entries.append(FAQEntry(
+                question=question,
+                answer=answer,
+                source=source,
+                embedding=_normalize(embedding),
+                reviewed=(question, answer) in reviewed
+            ))
+        self.source_hashes[source] = source_hash(text)
+
+    def remove_source(self, source: str) -> None:
+        """Drops every entry generated from source."""
+        self.entries = [e for e in self.entries if e.source != source]
+        self.source_hashes.pop(source, None)
+
+    def match(self, query_embedding: list[float], min_similarity: float, reviewed_only: bool = True) -> Optional[FAQMatch]:
+        """
+        Finds the entry whose question is most similar to the query.
+
+        Args:
+            query_embedding: The embedded user question.
+            min_similarity: The lowest cosine similarity that counts as the same question.
+            reviewed_only: Only consider entries a person has approved.
+
+        Returns:
+            The best match at or above min_similarity, or None.
+        """
+        query = _normalize(query_embedding)
+        best = None
+        for entry in self.entries:
+            if reviewed_only and not entry.reviewed:
+                continue
+            similarity = sum(q * e for q, e in zip(query, entry.embedding))
+            if similarity >= min_similarity and (best is None or similarity > best.similarity):
+                best = FAQMatch(entry=entry, similarity=similarity)
+        return best
+
+    def save(self, path: Path) -> None:
+        """Writes the index as JSON; review flags can be edited by hand."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, mode='w', encoding='utf-8') as f:
+            json.dump({
+                "source_hashes": self.source_hashes,
+                "entries": [asdict(entry) for entry in self.entries],
+            }, f, indent=1)
+
+    @classmethod
+    def load(cls, path: Path) -> "FAQIndex":
+        """Reads an index written by save()."""
+        if not path.exists():
+            raise FileNotFoundError(f"FAQ index not found at: {path}")
+
+        with open(path, mode='r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        return cls(
+            entries=[FAQEntry(**entry) for entry in data["entries"]],
+            source_hashes=data["source_hashes"]
+        )
@@ -0,0 +1,132 @@
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Hashable, Iterable, Optional
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+WORD_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9%$.,-]*")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "how", "i", "if", "in", "is", "it", "me", "my", "of", "on", "or", "our", "that", "the",
+    "this", "to", "what", "when", "which", "who", "why", "will", "with", "you", "your",
+})
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase and split text into alphanumeric terms, dropping stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def is_exact_term_query(query: str, max_terms: int = 3) -> bool:
+    """
+    Whether a query is a lookup of exact terms ("FHA", "PMI", "DTI 43%") rather than a question.
+
+    Every word must be an acronym (all capitals) or contain a digit; questions and
+    ordinary words ("How much down payment?") need semantic search.
+    """
+    if "?" in query:
+        return False
+    words = [word.rstrip(".,") for word in WORD_PATTERN.findall(query)]
+    words = [word for word in words if word.lower() not in STOPWORDS]
+    if not words or len(words) > max_terms:
+        return False
+    return all((word.isupper() and len(word) > 1) or any(c.isdigit() for c in word) for word in words)
+
+class BM25Index:
+    """
+    An in-process inverted index scored with Okapi BM25.
+
+    Built once at ingestion time from the same chunks that go into Chroma and
+    persisted as JSON next to the vector store, so exact terms like "FHA" or
+    "PMI" can be matched without an embedding call.
+    """
+    def __init__(self, texts: list[str], metadatas: Optional[list[dict]] = None, k1: float = 1.5, b: float = 0.75):
+        """
+        Builds the inverted index.
+
+        Args:
+            texts: The chunk texts to index.
+            metadatas: Metadata for each chunk, returned alongside search results.
+            k1: BM25 term-frequency saturation.
+            b: BM25 document-length normalization.
+        """
+        self.texts = texts
+        self.metadatas = metadatas if metadatas is not None else [{} for _ in texts]
+        self.k1 = k1
+        self.b = b
+
+        self.doc_lengths: list[int] = []
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        for doc_id, text in enumerate(texts):
+            terms = tokenize(text)
+            self.doc_lengths.append(len(terms))
+            for term, freq in Counter(terms).items():
+                self.postings.setdefault(term, []).append((doc_id, freq))
+
+        self.avg_doc_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+        n_docs = len(texts)
+        self.idf = {
+            term: math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query: str, k: int = 3) -> list[tuple[int, float]]:
+        """
+        Scores every chunk containing a query term.
+
+        Args:
+            query: The user's question.
+            k: The number of results to return.
+
+        Returns:
+            Up to k (chunk id, score) pairs, best first.
+        """
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, freq in self.postings[term]:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + self.k1 * length_norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def save(self, path: Path) -> None:
+        """Persists the indexed chunks; postings are rebuilt on load."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, mode='w', encoding='utf-8') as f:
+            json.dump({"k1": self.k1, "b": self.b, "texts": self.texts, "metadatas": self.metadatas}, f)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """Loads an index saved with save()."""
+        if not path.exists():
+            raise FileNotFoundError(f"Lexical index not found at: {path}")
+
+        with open(path, mode='r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data["texts"], data["metadatas"], k1=data["k1"], b=data["b"])
+
+def reciprocal_rank_fusion(rankings: Iterable[list], key: Callable[[object], Hashable], c: int = 60) -> list:
+    """
+    Merges ranked result lists with reciprocal-rank fusion.
+
+    Args:
+        rankings: Result lists, each ordered best first.
+        key: Identifies the same result across lists.
+        c: Damping constant; 60 is the value from the original RRF paper.
+
+    Returns:
+        The distinct results ordered by fused score, best first.
+    """
+    scores: dict[Hashable, float] = {}
+    items: dict[Hashable, object] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            item_key = key(item)
+            items.setdefault(item_key, item)
+            scores[item_key] = scores.get(item_key, 0.0) + 1 / (c + rank)
+
+    return [items[item_key] for item_key in sorted(scores, key=scores.get, reverse=True)]
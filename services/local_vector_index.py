@@ -0,0 +1,131 @@
+import json
+from pathlib import Path
+from typing import Optional
+import numpy as np
+
+EMBEDDINGS_FILE = "embeddings.f32"
+METADATA_FILE = "index.json"
+HNSW_FILE = "hnsw.bin"
+HNSW_MIN_ROWS = 50_000  # below this a flat scan is exact and already fast enough
+
+class LocalVectorIndex:
+    """
+    An embedded vector index over chunk embeddings stored as a memory-mapped float32 matrix.
+
+    The matrix is opened read-only with np.memmap, so every worker process on a host
+    shares the same page-cache copy instead of holding its own. Search is an exact
+    dot product over normalized rows, or an HNSW graph (hnswlib) when one was built.
+    """
+    def __init__(self, directory: Path, use_hnsw: bool = True):
+        """
+        Opens an index written by build().
+
+        Args:
+            directory: The directory holding the index files.
+            use_hnsw: Use the HNSW graph if the index has one; False forces an exact scan.
+        """
+        metadata_path = directory / METADATA_FILE
+        if not metadata_path.exists():
+            raise FileNotFoundError(f"Local vector index not found at: {directory}")
+
+        with open(metadata_path, mode='r', encoding='utf-8') as f:
+            metadata = json.load(f)
+
+        self.directory = directory
+        self.dim = metadata["dim"]
+        self.texts = metadata["texts"]
+        self.metadatas = metadata["metadatas"]
+        self.embeddings = np.memmap(
+            directory / EMBEDDINGS_FILE,
+            dtype=np.float32,
+            mode="r",
+            shape=(len(self.texts), self.dim)
+        )
+
+        self.hnsw = None
+        if use_hnsw and (directory / HNSW_FILE).exists():
+            try:
+                import hnswlib
+            except ImportError:
+                print(f"[WARN] {directory / HNSW_FILE} needs hnswlib (pip install hnswlib); using exact search.")
+            else:
+                self.hnsw = hnswlib.Index(space="ip", dim=self.dim)
+                self.hnsw.load_index(str(directory / HNSW_FILE), max_elements=len(self.texts))
+
+    @classmethod
+    def build(cls, directory: Path, embeddings: list, texts: list[str], metadatas: list[dict],
+              hnsw_min_rows: int = HNSW_MIN_ROWS) -> "LocalVectorIndex":
+        """
+        Writes the index files and opens the result.
+
+        Args:
+            directory: Where to write the index.
+            embeddings: One embedding per chunk.
+            texts: The chunk texts.
+            metadatas: The chunk metadata.
+            hnsw_min_rows: Build an HNSW graph when there are at least this many chunks and hnswlib
+                is installed; otherwise search is an exact scan.
+
+        Returns:
+            The opened index.
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got an array of shape {matrix.shape}")
+
+        # Normalize once so inner product is cosine similarity
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+
+        directory.mkdir(parents=True, exist_ok=True)
+        matrix.tofile(directory / EMBEDDINGS_FILE)
+        with open(directory / METADATA_FILE, mode='w', encoding='utf-8') as f:
+            json.dump({"dim": matrix.shape[1], "texts": texts, "metadatas": metadatas}, f)
+
+        hnsw_path = directory / HNSW_FILE
+        if hnsw_path.exists():
+            hnsw_path.unlink()
+        if len(matrix) >= hnsw_min_rows:
+            try:
+                import hnswlib
+            except ImportError:
+                print(f"[WARN] hnswlib is not installed; {len(matrix):,} chunks will be searched exactly (pip install hnswlib for an HNSW graph).")
+                return cls(directory)
+            graph = hnswlib.Index(space="ip", dim=matrix.shape[1])
+            graph.init_index(max_elements=len(matrix), ef_construction=200, M=16)
+            graph.add_items(matrix, np.arange(len(matrix)))
+            graph.save_index(str(hnsw_path))
+
+        return cls(directory)
+
+    def search(self, query_embedding, k: int = 3, ef: Optional[int] = None) -> list[tuple[int, float]]:
+        """
+        Finds the chunks most similar to a query embedding.
+
+        Args:
+            query_embedding: The embedded query.
+            k: The number of results to return.
+            ef: HNSW search breadth (ignored for exact search); defaults to max(k, 50).
+
+        Returns:
+            Up to k (chunk id, cosine similarity) pairs, best first.
+        """
+        k = min(k, len(self.texts))
+        if k == 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        if self.hnsw is not None:
+            self.hnsw.set_ef(max(ef or 50, k))
+            labels, distances = self.hnsw.knn_query(query, k=k)
+            # hnswlib's "ip" distance is 1 - inner product
+            return [(int(label), float(1 - distance)) for label, distance in zip(labels[0], distances[0])]
+
+        scores = self.embeddings @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
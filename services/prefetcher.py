@@ -0,0 +1,103 @@
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
+from typing import Any, Callable, Optional
+
+class Prefetcher:
+    """
+    Runs speculative work in background threads and hands the result to whoever claims it.
+
+    start() returns a key that is small enough to keep in the workflow state. The
+    result is claimed with take() if the speculation paid off, or dropped with
+    discard() (which cancels the work if it has not started). Results nobody claims
+    are dropped after `ttl` seconds.
+    """
+    def __init__(self, max_workers: int = 8, ttl: float = 60.0):
+        """
+        Args:
+            max_workers: Background threads; 0 disables prefetching (start() returns None).
+            ttl: Seconds an unclaimed result is kept.
+        """
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch") if max_workers else None
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pending: dict[str, tuple[Future, float]] = {}
+
+        self.started = 0
+        self.used = 0
+        self.discarded = 0
+        self.expired = 0
+
+    def start(self, fn: Callable[[], Any]) -> Optional[str]:
+        """
+        Starts fn in the background.
+
+        Returns:
+            The key to claim the result with, or None if prefetching is disabled.
+        """
+        if self._pool is None:
+            return None
+
+        now = time.monotonic()
+        future = self._pool.submit(fn)
+        with self._lock:
+            self._expire(now)
+            key = str(next(self._ids))
+            self._pending[key] = (future, now)
+            self.started += 1
+        return key
+
+    def _expire(self, now: float) -> None:
+        for key, (future, started) in list(self._pending.items()):
+            if now - started > self.ttl:
+                del self._pending[key]
+                future.cancel()
+                self.expired += 1
+
+    def take(self, key: Optional[str], timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Claims a prefetched result, waiting for it if the work is still running.
+
+        Returns:
+            The result, or None if there is nothing to claim under key.
+
+        Raises:
+            Whatever fn raised.
+        """
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._pending.pop(key, None)
+            if entry is not None:
+                self.used += 1
+        if entry is None:
+            return None
+        try:
+            return entry[0].result(timeout=timeout)
+        except CancelledError:
+            return None
+
+    def discard(self, key: Optional[str]) -> None:
+        """Drops a prefetch that will not be used, cancelling it if it has not started."""
+        if key is None:
+            return
+        with self._lock:
+            entry = self._pending.pop(key, None)
+            if entry is not None:
+                self.discarded += 1
+        if entry is not None:
+            entry[0].cancel()
+
+    def metrics(self) -> dict:
+        """Prefetches started, used, discarded and expired, and those still unclaimed."""
+        with self._lock:
+            return {
+                "started": self.started,
+                "used": self.used,
+                "discarded": self.discarded,
+                "expired": self.expired,
+                "pending": len(self._pending),
+            }
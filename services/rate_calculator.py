@@ -1,10 +1,164 @@
 import csv
+import itertools
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
+from services.eligibility_index import Eligibility, EligibilityIndex
+
+# Columns every rate matrix has; any other column is an extra pricing dimension
+CORE_COLUMNS = ("min_credit", "max_ltv", "max_dti", "loan_term", "rate")
+
+# Cell values that make a row apply to every value of a dimension
+WILDCARDS = {"", "*", "any"}
+
+# Bucket key for categorical values no row names explicitly; only wildcard rows cover it
+_UNLISTED = "*"
+
+
+@dataclass
+class RateQuote:
+    """
+    The outcome of a rate lookup.
+
+    Attributes:
+        rate: The matched interest rate, or None if the application was declined.
+        matched_row: The rate matrix row that produced the rate, if any.
+        decline_reason: Why no rate matched, or None if a rate was found.
+        eligibility: The nearest qualifying tier when no rate matched.
+    """
+    rate: Optional[float]
+    matched_row: Optional[dict] = None
+    decline_reason: Optional[str] = None
+    eligibility: Optional[Eligibility] = None
+
+
+class _Region:
+    """
+    The rows that apply to one combination of loan term, categorical values and range cells.
+
+    The first matching row for every (credit, LTV, DTI) cell is precomputed into a
+    flat grid, so a lookup is three bisects and a list access however many rows
+    the region holds.
+    """
+    def __init__(self, rows: list[dict]):
+        self.rows = rows + [None]  # the sentinel position marks cells no row covers
+        self.credit_tiers = sorted({row["min_credit"] for row in rows})
+        self.ltv_levels = sorted({row["max_ltv"] for row in rows})
+        self.dti_levels = sorted({row["max_dti"] for row in rows})
+
+        # One cell per bisect result: credit cell c sees tiers[:c], LTV/DTI cell i sees levels[i:]
+        n_credit = len(self.credit_tiers) + 1
+        self.n_ltv = len(self.ltv_levels) + 1
+        self.n_dti = len(self.dti_levels) + 1
+        plane = self.n_ltv * self.n_dti
+        grid = [len(rows)] * (n_credit * plane)
+
+        credit_pos = {value: i for i, value in enumerate(self.credit_tiers)}
+        ltv_pos = {value: i for i, value in enumerate(self.ltv_levels)}
+        dti_pos = {value: i for i, value in enumerate(self.dti_levels)}
+
+        # Each row covers a box of cells; mark its corner, then sweep so every cell
+        # holds the earliest row (file order wins) among the boxes covering it.
+        for pos, row in enumerate(rows):
+            cell = ((credit_pos[row["min_credit"]] + 1) * self.n_ltv + ltv_pos[row["max_ltv"]]) * self.n_dti + dti_pos[row["max_dti"]]
+            if pos < grid[cell]:
+                grid[cell] = pos
+
+        for c in range(1, n_credit):
+            start = c * plane
+            grid[start:start + plane] = map(min, grid[start:start + plane], grid[start - plane:start])
+        for c in range(n_credit):
+            for l in range(self.n_ltv - 2, -1, -1):
+                start = c * plane + l * self.n_dti
+                grid[start:start + self.n_dti] = map(min, grid[start:start + self.n_dti], grid[start + self.n_dti:start + 2 * self.n_dti])
+        for start in range(0, len(grid), self.n_dti):
+            for i in range(start + self.n_dti - 2, start - 1, -1):
+                if grid[i + 1] < grid[i]:
+                    grid[i] = grid[i + 1]
+        self.grid = grid
+
+        # Summary limits for decline reasons
+        self.min_credit = self.credit_tiers[0]
+        self.max_ltv = self.ltv_levels[-1]
+        self.max_dti = self.dti_levels[-1]
+        self.eligibility_index = EligibilityIndex(rows)
+
+    def lookup(self, credit_score: int, ltv: float, dti: float) -> Optional[dict]:
+        c = bisect_right(self.credit_tiers, credit_score)
+        l = bisect_left(self.ltv_levels, ltv)
+        d = bisect_left(self.dti_levels, dti)
+        return self.rows[self.grid[(c * self.n_ltv + l) * self.n_dti + d]]
+
+
+class _Bucket:
+    """
+    The rows sharing a loan term and categorical values, split into regions by the
+    cells of the extra range dimensions (e.g. loan-amount bands).
+    """
+    def __init__(self, rows: list[dict], range_columns: list[tuple[str, str, str]]):
+        self.range_columns = range_columns
+        self.bounds = [sorted({row[column] for row in rows if row[column] is not None}) for column, _, _ in range_columns]
+        positions = [{value: i for i, value in enumerate(bounds)} for bounds in self.bounds]
+
+        region_rows: dict[tuple, list[dict]] = {}
+        for row in rows:
+            spans = []
+            for (column, _, kind), bounds, pos in zip(range_columns, self.bounds, positions):
+                value = row[column]
+                if value is None:
+                    spans.append(range(len(bounds) + 1))
+                elif kind == "min":
+                    spans.append(range(pos[value] + 1, len(bounds) + 1))
+                else:
+                    spans.append(range(pos[value] + 1))
+            for cell in itertools.product(*spans):
+                region_rows.setdefault(cell, []).append(row)
+        self.regions = {cell: _Region(cell_rows) for cell, cell_rows in region_rows.items()}
+
+    def region(self, dimensions: dict) -> Optional[_Region]:
+        cell = []
+        for (_, field, kind), bounds in zip(self.range_columns, self.bounds):
+            value = dimensions.get(field)
+            if value is None:
+                # Unknown value: only rows without a bound on this dimension apply
+                cell.append(0 if kind == "min" else len(bounds))
+            elif kind == "min":
+                cell.append(bisect_right(bounds, value))
+            else:
+                cell.append(bisect_left(bounds, value))
+        return self.regions.get(tuple(cell))
+
+
+def _normalize(value) -> Optional[str]:
+    """Normalize a categorical value; wildcards and missing values become None."""
+    if value is None:
+        return None
+    value = str(value).strip().lower()
+    return None if value in WILDCARDS else value
+
+
+def _parse_bound(value: Optional[str]) -> Optional[float]:
+    """Parse a range bound; a blank or wildcard cell means the dimension is unbounded."""
+    if value is None or value.strip().lower() in WILDCARDS:
+        return None
+    return float(value)
+
 
 class RateCalculator:
     """
     A service to calculate loan interest rates based on a rate matrix CSV.
+
+    Besides the core columns (min_credit, max_ltv, max_dti, loan_term, rate) the matrix
+    may carry any number of extra dimensions:
+
+    - min_<field> / max_<field> columns are range dimensions, e.g. min_loan_amount and
+      max_loan_amount match the loan_amount passed to calculate() or quote().
+    - Any other column is a categorical dimension matched exactly (case-insensitive),
+      e.g. product or occupancy.
+
+    A blank, "*" or "any" cell makes the row apply to every value of that dimension.
+    As before, the first row in file order that matches wins.
     """
     def __init__(self, matrix_path: Path):
         """
@@ -14,7 +168,19 @@ class RateCalculator:
             matrix_path: The path to the rate_matrix.csv file.
         """
         self.matrix_path = matrix_path
+        self.categorical_columns: list[str] = []
+        self.range_columns: list[tuple[str, str, str]] = []  # (column, field, "min"|"max")
         self.rate_matrix = self._load_matrix()
+        self._build_index()
+
+    @property
+    def dimensions(self) -> list[str]:
+        """The application fields the matrix prices on beyond credit score, LTV, DTI and term."""
+        fields = list(self.categorical_columns)
+        for _, field, _ in self.range_columns:
+            if field not in fields:
+                fields.append(field)
+        return fields
 
     def _load_matrix(self) -> list[dict]:
         """Loads the rate matrix from the CSV file into memory."""
@@ -24,20 +190,69 @@ class RateCalculator:
 
         with open(self.matrix_path, mode='r', encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
+            for column in reader.fieldnames or []:
+                if column in CORE_COLUMNS:
+                    continue
+                if column.startswith(("min_", "max_")):
+                    self.range_columns.append((column, column[4:], column[:3]))
+                else:
+                    self.categorical_columns.append(column)
+
             for row in reader:
                 try:
-                    matrix.append({
+                    entry = {
                         "min_credit": int(row["min_credit"]),
                         "max_ltv": float(row["max_ltv"]),
                         "max_dti": float(row["max_dti"]),
                         "loan_term": int(row["loan_term"]),
                         "rate": float(row["rate"]),
-                    })
+                    }
+                    for column in self.categorical_columns:
+                        entry[column] = _normalize(row[column])
+                    for column, _, _ in self.range_columns:
+                        entry[column] = _parse_bound(row[column])
+                    matrix.append(entry)
                 except (ValueError, KeyError) as e:
                     print(f"Warning: Skipping invalid row in rate matrix: {row}. Error: {e}")
         return matrix
 
-    def calculate(self, credit_score: int, ltv: float, dti: float, loan_term: int) -> Optional[float]:
+    def _build_index(self) -> None:
+        """
+        Builds the lookup index: loan term and categorical values select a bucket,
+        range cells select a region, and the region grid resolves credit, LTV and DTI.
+        """
+        self._values = {
+            column: sorted({row[column] for row in self.rate_matrix if row[column] is not None})
+            for column in self.categorical_columns
+        }
+        self._has_wildcard = {
+            column: any(row[column] is None for row in self.rate_matrix)
+            for column in self.categorical_columns
+        }
+        self._terms = sorted({row["loan_term"] for row in self.rate_matrix})
+
+        # Wildcard rows are copied into the bucket of every listed value and the unlisted bucket
+        rows_by_key: dict[tuple, list[dict]] = {}
+        for row in self.rate_matrix:
+            choices = [
+                [row[column]] if row[column] is not None else self._values[column] + [_UNLISTED]
+                for column in self.categorical_columns
+            ]
+            for values in itertools.product(*choices):
+                rows_by_key.setdefault((row["loan_term"], *values), []).append(row)
+        self._buckets = {key: _Bucket(rows, self.range_columns) for key, rows in rows_by_key.items()}
+
+    def _region(self, loan_term: int, dimensions: dict) -> Optional[_Region]:
+        key = [loan_term]
+        for column in self.categorical_columns:
+            value = _normalize(dimensions.get(column))
+            key.append(value if value in self._values[column] else _UNLISTED)
+        bucket = self._buckets.get(tuple(key))
+        if bucket is None:
+            return None
+        return bucket.region(dimensions)
+
+    def calculate(self, credit_score: int, ltv: float, dti: float, loan_term: int, **dimensions) -> Optional[float]:
         """
         Calculates the interest rate based on user's financial data.
 
@@ -46,19 +261,72 @@ class RateCalculator:
             ltv: The loan-to-value ratio.
             dti: The debt-to-income ratio.
             loan_term: The loan term in years (15 or 30).
+            **dimensions: Values for the matrix's extra dimensions (e.g. product, occupancy,
+                loan_amount). Fields the matrix does not price on are ignored.
 
         Returns:
             The calculated interest rate as a float, or None if no matching rate is found.
         """
+        return self.quote(credit_score, ltv, dti, loan_term, **dimensions).rate
+
+    def quote(self, credit_score: int, ltv: float, dti: float, loan_term: int, **dimensions) -> RateQuote:
+        """
+        Looks up the rate for the user's financial data, keeping the matched row
+        and the reason for a decline.
+
+        Args:
+            credit_score: The user's credit score.
+            ltv: The loan-to-value ratio.
+            dti: The debt-to-income ratio.
+            loan_term: The loan term in years (15 or 30).
+            **dimensions: Values for the matrix's extra dimensions, as for calculate().
+
+        Returns:
+            A RateQuote with either the rate and matched row, or a decline reason.
+        """
         if not self.rate_matrix:
-            return None
+            return RateQuote(rate=None, decline_reason="The rate matrix is empty.")
 
-        # Find matching rate based on criteria
-        for row in self.rate_matrix:
-            if (credit_score >= row["min_credit"] and
-                ltv <= row["max_ltv"] and
-                dti <= row["max_dti"] and
-                loan_term == row["loan_term"]):
-                return row["rate"]
+        region = self._region(loan_term, dimensions)
+        if region is None:
+            return RateQuote(rate=None, decline_reason=self._unpriced_reason(loan_term, dimensions))
 
-        return None
+        row = region.lookup(credit_score, ltv, dti)
+        if row is not None:
+            return RateQuote(rate=row["rate"], matched_row=row)
+
+        return RateQuote(
+            rate=None,
+            decline_reason=self._decline_reason(region, credit_score, ltv, dti),
+            eligibility=region.eligibility_index.nearest(credit_score, ltv, dti, loan_term)
+        )
+
+    def _unpriced_reason(self, loan_term: int, dimensions: dict) -> str:
+        """Explains why no row applies to the term and extra dimensions at all."""
+        if loan_term not in self._terms:
+            return f"A {loan_term}-year term is not offered. Available terms: {', '.join(str(t) for t in self._terms)} years."
+
+        for column in self.categorical_columns:
+            value = _normalize(dimensions.get(column))
+            if value in self._values[column] or self._has_wildcard[column]:
+                continue
+            label = column.replace("_", " ")
+            available = ", ".join(self._values[column])
+            if value is None:
+                return f"Please specify a {label}. Available: {available}."
+            return f"A {label} of '{value}' is not offered. Available: {available}."
+
+        return f"We don't offer pricing for this combination of loan term, {', '.join(d.replace('_', ' ') for d in self.dimensions)}."
+
+    def _decline_reason(self, region: _Region, credit_score: int, ltv: float, dti: float) -> str:
+        """Explains which criterion excluded the application from every applicable row."""
+        if credit_score < region.min_credit:
+            return f"A credit score of {credit_score} is below our minimum of {region.min_credit}."
+
+        if ltv > region.max_ltv:
+            return f"An LTV of {ltv:.1f}% exceeds our maximum of {region.max_ltv:g}%."
+
+        if dti > region.max_dti:
+            return f"A DTI of {dti:.1f}% exceeds our maximum of {region.max_dti:g}%."
+
+        return "The combination of credit score, LTV and DTI is outside our lending guidelines."
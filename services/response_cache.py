@@ -0,0 +1,146 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+class ResponseCache:
+    """
+    A persistent LLM response cache backed by SQLite, with a size cap and LRU eviction.
+
+    The database runs in WAL mode so several worker processes can read and write
+    the same file concurrently. Each thread gets its own connection. The cache is
+    best effort: a database error (locked past the busy timeout, disk full,
+    read-only volume) is logged and treated as a miss or a skipped write.
+    """
+    def __init__(self, path: Path, max_entries: int = 10_000, evict_every: int = 100):
+        """
+        Opens (or creates) the cache database.
+
+        Args:
+            path: The SQLite file, shared by every process using the cache.
+            max_entries: Entries kept after eviction; least recently used go first.
+            evict_every: Check the size cap after this many writes from this process.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; a busy timeout lets writers from other processes finish
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(template: str, rendered_input: dict, model: str) -> str:
+        """
+        Builds the cache key for a prompt call.
+
+        Args:
+            template: The prompt template text.
+            rendered_input: The variables the template is rendered with.
+            model: The model name.
+
+        Returns:
+            A hex digest identifying the call.
+        """
+        payload = json.dumps([model, template, rendered_input], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _record_error(self, operation: str, error: sqlite3.Error) -> None:
+        with self._lock:
+            self.errors += 1
+        print(f"[WARN] Response cache {operation} failed: {error}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for key, or None, marking it recently used."""
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            self._record_error("read", e)
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        try:
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error:
+            # Another process holds the write lock; recency is best effort
+            pass
+        return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Stores a response, evicting least recently used entries past the size cap."""
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, last_access) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
+        except sqlite3.Error as e:
+            self._record_error("write", e)
+            return
+
+        with self._lock:
+            self._writes += 1
+            check = self._writes % self.evict_every == 0
+        if check:
+            try:
+                self.evict()
+            except sqlite3.Error as e:
+                self._record_error("eviction", e)
+
+    def evict(self) -> int:
+        """
+        Deletes least recently used entries beyond max_entries.
+
+        Returns:
+            The number of entries deleted.
+        """
+        conn = self._connection()
+        cursor = conn.execute("""
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        with self._lock:
+            self.evictions += cursor.rowcount
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def metrics(self) -> dict:
+        """Hits, misses, evictions and database errors seen by this process."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "errors": self.errors}
@@ -0,0 +1,66 @@
+import threading
+from typing import Any, Callable, Hashable
+
+class _Call:
+    """An upstream call in flight, awaited by every caller with the same key."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one.
+
+    The first caller for a key runs the call; callers that arrive with the same key
+    while it is in flight wait for it and share its result (or exception). Once the
+    call finishes the key is forgotten, so this is not a cache.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Runs fn, or waits for the identical call already in flight.
+
+        Args:
+            key: Identifies identical calls.
+            fn: Makes the upstream call.
+
+        Returns:
+            The result of the call for this key.
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight[key] = call
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def metrics(self) -> dict:
+        """Upstream calls made and calls served by another caller's in-flight request."""
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
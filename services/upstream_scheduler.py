@@ -0,0 +1,210 @@
+import bisect
+import itertools
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# Lower runs first
+PRIORITY_APPLICATION = 0  # extracting application answers; the borrower is mid-flow
+PRIORITY_ROUTING = 1  # greeting/topic/intent classification
+PRIORITY_QA = 2  # relevance checks and answers
+
+class UpstreamBusyError(RuntimeError):
+    """Base for calls the scheduler turned away under backpressure; the caller can retry later."""
+
+class QueueFullError(UpstreamBusyError):
+    """Raised when the scheduler queue is at capacity and a call is rejected."""
+
+class QueueTimeoutError(UpstreamBusyError, TimeoutError):
+    """Raised when a queued call is not admitted within its timeout."""
+
+class TokenBucket:
+    """
+    A token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each call
+    takes one token.
+    """
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one will be.
+        """
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class _Ticket:
+    def __init__(self, priority: int, seq: int, model: str):
+        self.priority = priority
+        self.seq = seq
+        self.model = model
+        self.enqueued = time.monotonic()
+        self.granted = False
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class UpstreamScheduler:
+    """
+    Admits upstream model calls under a per-model rate limit and a global in-flight cap.
+
+    Callers block in a priority queue until a slot and a rate-limit token are free,
+    so bursts queue up locally instead of tripping provider rate limits, and
+    application steps overtake Q&A answers. The queue is bounded: when it is full
+    new calls are rejected immediately rather than waiting behind everyone else.
+    """
+    def __init__(self, max_in_flight: int = 8, requests_per_second: float = 5.0, burst: int = 10,
+                 max_queue: int = 100, model_limits: Optional[dict[str, tuple[float, int]]] = None):
+        """
+        Args:
+            max_in_flight: Maximum concurrent upstream calls across all models.
+            requests_per_second: Default sustained call rate per model.
+            burst: Default token-bucket capacity per model.
+            max_queue: Maximum calls waiting for admission.
+            model_limits: Per-model (requests_per_second, burst) overrides.
+        """
+        self.max_in_flight = max_in_flight
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_queue = max_queue
+        self.model_limits = model_limits or {}
+
+        self._cond = threading.Condition()
+        self._queue: list[_Ticket] = []
+        self._seq = itertools.count()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._in_flight = 0
+
+        self._submitted = 0
+        self._rejected = 0
+        self._max_queue_depth = 0
+        self._wait_stats: dict[int, dict] = {}
+
+    def _bucket(self, model: str) -> TokenBucket:
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            rate, burst = self.model_limits.get(model, (self.requests_per_second, self.burst))
+            bucket = self._buckets[model] = TokenBucket(rate, burst)
+        return bucket
+
+    def _dispatch(self) -> Optional[float]:
+        """
+        Grants queued tickets in priority order while slots and tokens allow.
+
+        Returns:
+            Seconds until a rate-limited ticket could be granted, if any are waiting on tokens.
+        """
+        retry_after = None
+        limited_models = set()
+        for ticket in list(self._queue):
+            if self._in_flight >= self.max_in_flight:
+                break
+            if ticket.model in limited_models:
+                continue
+            delay = self._bucket(ticket.model).try_acquire()
+            if delay:
+                # Other models may still have tokens, so keep scanning
+                limited_models.add(ticket.model)
+                retry_after = delay if retry_after is None else min(retry_after, delay)
+                continue
+            self._queue.remove(ticket)
+            ticket.granted = True
+            self._in_flight += 1
+        return retry_after
+
+    def submit(self, model: str, priority: int, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Runs fn once the scheduler admits it.
+
+        Args:
+            model: The upstream model, used to pick the rate limit.
+            priority: Lower values are admitted first.
+            fn: Makes the upstream call.
+            timeout: Maximum seconds to wait in the queue.
+
+        Returns:
+            The result of fn.
+
+        Raises:
+            QueueFullError: If the queue is at capacity.
+            QueueTimeoutError: If the call was not admitted within timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self._rejected += 1
+                raise QueueFullError(f"Upstream queue is full ({self.max_queue} waiting)")
+
+            ticket = _Ticket(priority, next(self._seq), model)
+            bisect.insort(self._queue, ticket)
+            self._submitted += 1
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+
+            while True:
+                retry_after = self._dispatch()
+                if ticket.granted:
+                    break
+                # Wake others the dispatch may have granted
+                self._cond.notify_all()
+
+                wait = retry_after
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._queue.remove(ticket)
+                        raise QueueTimeoutError(f"Upstream call to {model} was not admitted within {timeout}s")
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+            self._record_wait(priority, time.monotonic() - ticket.enqueued)
+            self._cond.notify_all()
+
+        try:
+            return fn()
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def _record_wait(self, priority: int, waited: float) -> None:
+        stats = self._wait_stats.setdefault(priority, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += waited
+        stats["max"] = max(stats["max"], waited)
+
+    def metrics(self) -> dict:
+        """Queue depth, in-flight calls, rejections and queue wait times per priority."""
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_queue_depth,
+                "in_flight": self._in_flight,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "wait_seconds": {
+                    priority: {
+                        "count": stats["count"],
+                        "mean": stats["total"] / stats["count"],
+                        "max": stats["max"],
+                    }
+                    for priority, stats in sorted(self._wait_stats.items())
+                },
+            }
@@ -0,0 +1,118 @@
+import pytest
+from services.application_parser import parse_application, is_correction, is_valid_field, match_choice, OCCUPANCY_TYPES
+
+
+class TestParseApplication:
+    """Test suite for local application field parsing."""
+
+    def test_everything_at_once(self):
+        """Test that labelled fields are picked out of a single message."""
+        parsed = parse_application("750 score, $400k house, 20% down, $120k income")
+        assert parsed.fields == {
+            "credit_score": 750,
+            "home_value": 400000,
+            "down_payment_percent": 20.0,
+            "income": 120000,
+        }
+        assert parsed.leftover == []
+
+    def test_full_sentence(self):
+        """Test a longer message covering every field."""
+        parsed = parse_application(
+            "My credit score is 750, the house costs $400,000 and I can put down $80,000. "
+            "I make 10k a month and pay $1,500 a month in debts. 30 year fixed, FHA, primary residence."
+        )
+        assert parsed.fields == {
+            "credit_score": 750,
+            "home_value": 400000,
+            "down_payment": 80000,
+            "income": 120000,
+            "debts": 1500.0,
+            "loan_term": 30,
+            "product": "fha",
+            "occupancy": "primary",
+        }
+
+    @pytest.mark.parametrize("text, expected, fields", [
+        ("750", "credit_score", {"credit_score": 750}),
+        ("about 100000", "home_value", {"home_value": 100000}),
+        ("20%", "down_payment", {"down_payment_percent": 20.0}),
+        ("$50,000", "down_payment", {"down_payment": 50000}),
+        ("$120,000", "income", {"income": 120000}),
+        ("Its about 1000", "debts", {"debts": 1000.0}),
+        ("30", "loan_term", {"loan_term": 30}),
+        ("rental", "occupancy", {"occupancy": "investment"}),
+    ])
+    def test_bare_answer_to_question(self, text, expected, fields):
+        """Test that an unlabelled answer fills the field that was asked for."""
+        assert parse_application(text, expected).fields == fields
+
+    def test_bare_number_without_question(self):
+        """Test that an unlabelled number is left for the model when no field was asked for."""
+        parsed = parse_application("750")
+        assert parsed.fields == {}
+        assert parsed.leftover == ["750"]
+
+    def test_ambiguous_answer_not_guessed(self):
+        """Test that several unlabelled numbers are not attributed."""
+        parsed = parse_application("620 or 640", "credit_score")
+        assert "credit_score" not in parsed.fields
+        assert parsed.leftover == ["620", "640"]
+
+    def test_out_of_range_credit_score(self):
+        """Test that implausible values are rejected."""
+        assert parse_application("900", "credit_score").fields == {}
+
+    def test_loan_term_not_home_value(self):
+        """Test that a term is not read as a home price."""
+        assert parse_application("I want to buy a home 30 year fixed").fields == {"loan_term": 30}
+
+    def test_years_without_loan_wording_not_a_term(self):
+        """Test that an unlabelled "N years" is only a loan term when the term was asked for."""
+        parsed = parse_application("I've been at my job 15 years and earn $95k", "income")
+        assert parsed.fields == {"income": 95000}
+        assert parsed.leftover == ["15"]
+        assert parse_application("15 years", "loan_term").fields == {"loan_term": 15}
+        assert parse_application("a 15-year mortgage", "income").fields == {"loan_term": 15}
+
+    @pytest.mark.parametrize("name, value, valid", [
+        ("credit_score", 750, True),
+        ("credit_score", 9000, False),
+        ("income", 500, False),
+        ("debts", -1, False),
+        ("down_payment", "lots", False),
+        ("loan_term", 20, False),
+        ("product", "fha", True),
+        ("occupancy", "castle", False),
+        ("rate_quote", 1, False),
+    ])
+    def test_is_valid_field(self, name, value, valid):
+        """Test the plausibility checks shared by local parsing and the model fallback."""
+        assert is_valid_field(name, value) is valid
+
+    def test_correction_wording(self):
+        """Test that corrections are recognised."""
+        assert is_correction("actually my score is 700")
+        assert is_correction("sorry, I meant $450k")
+        assert not is_correction("my score is 700")
+
+    def test_renting_is_not_investment(self):
+        """Test that loose occupancy keywords only apply when occupancy was asked for."""
+        assert parse_application("I currently rent").fields == {}
+        assert match_choice("I currently rent", OCCUPANCY_TYPES) == "investment"
+
+    @pytest.mark.parametrize("text, occupancy", [
+        ("It will be a second residence", "second_home"),
+        ("an investment residence", "investment"),
+        ("my main residence", "primary"),
+        ("primary residence", "primary"),
+        ("I want to remain flexible", None),
+        ("I'll maintain it myself", None),
+    ])
+    def test_occupancy_keywords(self, text, occupancy):
+        """Test that occupancy answers resolve by their specific words, not generic ones."""
+        assert parse_application(text, "occupancy").fields.get("occupancy") == occupancy
+
+    def test_words_left_for_model(self):
+        """Test that amounts in words are not parsed locally."""
+        assert parse_application("fifty thousand", "down_payment").fields == {}
@@ -0,0 +1,109 @@
+import pytest
+from dataclasses import dataclass, field
+from pathlib import Path
+from services.context_assembly import assemble_context, estimate_tokens
+
+DOCS_DIR = Path(__file__).parent.parent / "docs"
+
+
+@dataclass
+class Doc:
+    """Stand-in for a retrieved langchain Document."""
+    page_content: str
+    metadata: dict = field(default_factory=dict)
+
+
+def split_with_overlap(text, size, overlap):
+    """Fixed-size chunks with overlap, like the ingestion splitter."""
+    chunks = []
+    start = 0
+    while start < len(text):
+        chunks.append((start, text[start:start + size]))
+        if start + size >= len(text):
+            break
+        start += size - overlap
+    return chunks
+
+
+class TestAssembleContext:
+    """Test suite for assemble_context."""
+
+    @pytest.fixture
+    def source_text(self):
+        return (DOCS_DIR / "subprime.md").read_text()
+
+    def test_merges_overlapping_chunks_by_start_index(self, source_text):
+        """Test that overlapping chunks with positions merge into the original span."""
+        chunks = split_with_overlap(source_text, 512, 200)[:3]
+        docs = [Doc(text, {"source": "subprime.md", "start_index": start}) for start, text in chunks]
+
+        context = assemble_context(docs, token_budget=10_000)
+
+        assert len(context.passages) == 1
+        assert context.passages[0].text == source_text[:chunks[-1][0] + len(chunks[-1][1])]
+        assert context.saved_tokens > 0
+
+    def test_merges_overlapping_chunks_without_positions(self, source_text):
+        """Test that overlap is detected from the text when start_index is missing."""
+        chunks = split_with_overlap(source_text, 512, 200)[:2]
+        # Retrieved out of order: the later chunk ranked first
+        docs = [Doc(chunks[1][1], {"source": "subprime.md"}), Doc(chunks[0][1], {"source": "subprime.md"})]
+
+        context = assemble_context(docs, token_budget=10_000)
+
+        assert len(context.passages) == 1
+        assert context.passages[0].text == source_text[:chunks[1][0] + len(chunks[1][1])]
+
+    def test_does_not_merge_across_sources(self):
+        """Test that identical positions in different sources stay separate."""
+        docs = [
+            Doc("FHA loans require 3.5% down.", {"source": "a.md", "start_index": 0}),
+            Doc("Jumbo loans require 20% down.", {"source": "b.md", "start_index": 0}),
+        ]
+
+        context = assemble_context(docs, token_budget=10_000)
+
+        assert [p.source for p in context.passages] == ["a.md", "b.md"]
+
+    def test_dedupes_repeated_paragraphs(self):
+        """Test that a paragraph repeated in another source is only included once."""
+        shared = "All loans are subject to underwriting approval."
+        docs = [
+            Doc(f"FHA loans require 3.5% down.\n\n{shared}", {"source": "a.md"}),
+            Doc(f"{shared}\n\nJumbo loans require 20% down.", {"source": "b.md"}),
+        ]
+
+        context = assemble_context(docs, token_budget=10_000)
+
+        assert context.text.count(shared) == 1
+        assert "Jumbo loans" in context.text
+
+    def test_packs_to_budget_by_relevance(self):
+        """Test that lower-ranked passages are dropped when the budget is exceeded."""
+        docs = [
+            Doc("a" * 400, {"source": "a.md"}),
+            Doc("b" * 400, {"source": "b.md"}),
+            Doc("c" * 40, {"source": "c.md"}),
+        ]
+
+        context = assemble_context(docs, token_budget=120)
+
+        assert [p.source for p in context.passages] == ["a.md", "c.md"]
+        assert context.context_tokens <= 120
+
+    def test_truncates_when_nothing_fits(self):
+        """Test that the most relevant passage is truncated if it exceeds the budget alone."""
+        context = assemble_context([Doc("x" * 1000, {"source": "a.md"})], token_budget=50)
+
+        assert context.context_tokens == 50
+
+    def test_empty(self):
+        """Test that no documents produce an empty context."""
+        context = assemble_context([], token_budget=100)
+        assert context.text == ""
+        assert context.saved_tokens == 0
+
+    def test_estimate_tokens(self):
+        """Test the token estimate rounds up."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcde") == 2
@@ -0,0 +1,76 @@
+import pytest
+from pathlib import Path
+from services.eligibility_index import EligibilityIndex
+from services.rate_calculator import RateCalculator
+
+# Path to the actual rate matrix
+RATE_MATRIX_PATH = Path(__file__).parent.parent / "docs" / "rate_matrix.csv"
+
+
+class TestEligibilityIndex:
+    """Test suite for EligibilityIndex class."""
+
+    @pytest.fixture
+    def index(self):
+        calculator = RateCalculator(matrix_path=RATE_MATRIX_PATH)
+        return EligibilityIndex(calculator.rate_matrix)
+
+    def test_ltv_above_maximum(self, index):
+        """Test that a high LTV is told the highest qualifying LTV."""
+        eligibility = index.nearest(credit_score=760, ltv=97, dti=36, loan_term=30)
+        assert eligibility.max_ltv == 95
+        assert eligibility.max_dti is None
+        assert eligibility.min_credit is None
+
+    def test_dti_above_maximum(self, index):
+        """Test that a high DTI is told the highest qualifying DTI."""
+        eligibility = index.nearest(credit_score=700, ltv=80, dti=55, loan_term=15)
+        assert eligibility.max_dti == 50
+        assert eligibility.max_ltv is None
+
+    def test_credit_below_minimum(self, index):
+        """Test that a low credit score is told the lowest qualifying score."""
+        eligibility = index.nearest(credit_score=550, ltv=80, dti=36, loan_term=30)
+        assert eligibility.min_credit == 600
+        assert eligibility.max_ltv is None
+        assert eligibility.max_dti is None
+
+    def test_unknown_term_returns_none(self, index):
+        """Test that a loan term not in the matrix has no eligibility."""
+        assert index.nearest(credit_score=760, ltv=80, dti=36, loan_term=20) is None
+
+    def test_limits_depend_on_fixed_factors(self):
+        """Test that each limit only considers rows matching the other two factors."""
+        index = EligibilityIndex([
+            {"min_credit": 700, "max_ltv": 95, "max_dti": 36, "loan_term": 30, "rate": 7.0},
+            {"min_credit": 640, "max_ltv": 80, "max_dti": 45, "loan_term": 30, "rate": 7.5},
+        ])
+
+        # A 660 score can only use the second row, so LTV is capped at 80
+        eligibility = index.nearest(credit_score=660, ltv=90, dti=40, loan_term=30)
+        assert eligibility.max_ltv == 80
+        assert eligibility.max_dti is None
+        assert eligibility.min_credit is None
+
+        # At 90% LTV and 36% DTI, only the first row qualifies
+        eligibility = index.nearest(credit_score=660, ltv=90, dti=36, loan_term=30)
+        assert eligibility.min_credit == 700
+
+    def test_matches_brute_force(self, index):
+        """Test the index against a scan of the matrix over a grid of applications."""
+        calculator = RateCalculator(matrix_path=RATE_MATRIX_PATH)
+
+        for credit_score in (590, 610, 650, 700, 740, 800):
+            for ltv in (55, 65, 85, 93, 99):
+                for dti in (30, 40, 45, 52):
+                    eligibility = index.nearest(credit_score, ltv, dti, 30)
+                    rows = [row for row in calculator.rate_matrix if row["loan_term"] == 30]
+                    assert eligibility.max_ltv == max(
+                        (r["max_ltv"] for r in rows if credit_score >= r["min_credit"] and dti <= r["max_dti"]),
+                        default=None)
+                    assert eligibility.max_dti == max(
+                        (r["max_dti"] for r in rows if credit_score >= r["min_credit"] and ltv <= r["max_ltv"]),
+                        default=None)
+                    assert eligibility.min_credit == min(
+                        (r["min_credit"] for r in rows if ltv <= r["max_ltv"] and dti <= r["max_dti"]),
+                        default=None)
@@ -0,0 +1,86 @@
+import pytest
+from services.faq_index import FAQIndex, source_hash
+
+DOC = "Borrowers need a 620 credit score for conventional loans."
+
+
+class TestFAQIndex:
+    """Test suite for FAQIndex class."""
+
+    @pytest.fixture
+    def index(self):
+        index = FAQIndex()
+        index.replace_source(
+            "docs/underwriting.md", DOC,
+            pairs=[("What credit score do I need?", "620 for conventional loans."),
+                   ("What is PMI?", "Mortgage insurance.")],
+            embeddings=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+        )
+        return index
+
+    def test_new_entries_unreviewed(self, index):
+        """Test that generated entries are not served until reviewed."""
+        assert all(not entry.reviewed for entry in index.entries)
+        assert index.match([1.0, 0.0, 0.0], min_similarity=0.9) is None
+        assert index.match([1.0, 0.0, 0.0], min_similarity=0.9, reviewed_only=False) is not None
+
+    def test_match_best_above_threshold(self, index):
+        """Test that the most similar reviewed question is matched."""
+        for entry in index.entries:
+            entry.reviewed = True
+        match = index.match([0.9, 0.1, 0.0], min_similarity=0.9)
+        assert match.entry.question == "What credit score do I need?"
+        assert match.similarity == pytest.approx(0.9 / (0.82 ** 0.5))
+
+    def test_no_match_below_threshold(self, index):
+        """Test that a dissimilar question is not matched."""
+        for entry in index.entries:
+            entry.reviewed = True
+        assert index.match([0.6, 0.6, 0.5], min_similarity=0.9) is None
+
+    def test_is_current(self, index):
+        """Test that a changed document is detected by its content hash."""
+        assert index.is_current("docs/underwriting.md", DOC)
+        assert not index.is_current("docs/underwriting.md", DOC + " Updated.")
+        assert not index.is_current("docs/subprime.md", DOC)
+
+    def test_regenerate_keeps_unchanged_reviews(self, index):
+        """Test that regenerating a document keeps reviews of identical pairs only."""
+        for entry in index.entries:
+            entry.reviewed = True
+        index.replace_source(
+            "docs/underwriting.md", DOC + " Updated.",
+            pairs=[("What credit score do I need?", "620 for conventional loans."),
+                   ("What is PMI?", "Private mortgage insurance.")],
+            embeddings=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+        )
+        reviewed = {entry.answer: entry.reviewed for entry in index.entries}
+        assert reviewed == {"620 for conventional loans.": True, "Private mortgage insurance.": False}
+        assert index.source_hashes["docs/underwriting.md"] == source_hash(DOC + " Updated.")
+
+    def test_remove_source(self, index):
+        """Test that removing a document drops its entries and hash."""
+        index.remove_source("docs/underwriting.md")
+        assert index.entries == []
+        assert index.source_hashes == {}
+
+    def test_save_and_load(self, index, tmp_path):
+        """Test that the index round-trips through JSON."""
+        index.entries[0].reviewed = True
+        path = tmp_path / "faq_index.json"
+        index.save(path)
+
+        loaded = FAQIndex.load(path)
+        assert loaded.source_hashes == index.source_hashes
+        assert [(e.question, e.reviewed) for e in loaded.entries] == [(e.question, e.reviewed) for e in index.entries]
+        assert loaded.match([1.0, 0.0, 0.0], min_similarity=0.9).entry.answer == "620 for conventional loans."
+
+    def test_load_missing(self, tmp_path):
+        """Test that FileNotFoundError is raised when the index file doesn't exist."""
+        with pytest.raises(FileNotFoundError):
+            FAQIndex.load(tmp_path / "missing.json")
+
+    def test_embedding_count_mismatch(self):
+        """Test that pairs and embeddings must line up."""
+        with pytest.raises(ValueError):
+            FAQIndex().replace_source("doc", "text", pairs=[("q", "a")], embeddings=[])
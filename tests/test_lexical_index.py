@@ -0,0 +1,89 @@
+import pytest
+from pathlib import Path
+from services.lexical_index import BM25Index, is_exact_term_query, reciprocal_rank_fusion, tokenize
+
+DOCS_DIR = Path(__file__).parent.parent / "docs"
+
+
+class TestBM25Index:
+    """Test suite for BM25Index class."""
+
+    @pytest.fixture
+    def index(self):
+        return BM25Index(
+            texts=[
+                "FHA loans allow a down payment as low as 3.5 percent.",
+                "Private mortgage insurance (PMI) is required when LTV exceeds 80 percent.",
+                "The maximum DTI ratio is 43 percent for conventional loans.",
+            ],
+            metadatas=[{"source": "a.md"}, {"source": "b.md"}, {"source": "c.md"}]
+        )
+
+    def test_tokenize_drops_stopwords_and_punctuation(self):
+        """Test that tokenization lowercases and drops stopwords."""
+        assert tokenize("What is the DTI 43%?") == ["dti", "43"]
+
+    def test_exact_term_ranks_first(self, index):
+        """Test that an acronym only present in one chunk retrieves that chunk."""
+        results = index.search("PMI", k=3)
+        assert results[0][0] == 1
+        assert len(results) == 1
+
+    def test_multiple_terms(self, index):
+        """Test that chunks matching more query terms score higher."""
+        results = index.search("DTI 43 conventional", k=3)
+        assert results[0][0] == 2
+
+    def test_unknown_terms_return_nothing(self, index):
+        """Test that a query with no indexed terms returns no results."""
+        assert index.search("weather tomorrow") == []
+
+    def test_save_and_load_round_trip(self, index, tmp_path):
+        """Test that a persisted index returns the same results."""
+        path = tmp_path / "bm25_index.json"
+        index.save(path)
+        loaded = BM25Index.load(path)
+
+        assert loaded.search("FHA down payment") == index.search("FHA down payment")
+        assert loaded.metadatas[0] == {"source": "a.md"}
+
+    def test_load_missing_file(self, tmp_path):
+        """Test that loading a missing index raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            BM25Index.load(tmp_path / "missing.json")
+
+    def test_finds_terms_in_company_docs(self):
+        """Test keyword retrieval over the shipped documents."""
+        paths = sorted(DOCS_DIR.glob("*.md"))
+        index = BM25Index(texts=[path.read_text() for path in paths])
+
+        doc_id, _ = index.search("subprime", k=1)[0]
+        assert paths[doc_id].name == "subprime.md"
+
+
+class TestExactTermQuery:
+    """Test suite for is_exact_term_query."""
+
+    @pytest.mark.parametrize("query", ["FHA", "PMI", "DTI 43%", "FHA 203k"])
+    def test_acronyms_and_numbers(self, query):
+        """Test that acronyms and figures are treated as exact-term lookups."""
+        assert is_exact_term_query(query)
+
+    @pytest.mark.parametrize("query", ["How much down payment?", "down payment", "closing costs", "FHA or conventional loan for me", ""])
+    def test_natural_language(self, query):
+        """Test that questions and ordinary words are not."""
+        assert not is_exact_term_query(query)
+
+
+class TestReciprocalRankFusion:
+    """Test suite for reciprocal_rank_fusion."""
+
+    def test_result_in_both_lists_wins(self):
+        """Test that a result ranked in both lists beats single-list results."""
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["d", "b", "e"]], key=lambda item: item)
+        assert fused[0] == "b"
+        assert sorted(fused) == ["a", "b", "c", "d", "e"]
+
+    def test_empty_lists(self):
+        """Test that fusing nothing returns nothing."""
+        assert reciprocal_rank_fusion([[], []], key=lambda item: item) == []
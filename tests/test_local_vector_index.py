@@ -0,0 +1,60 @@
+import sys
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services.local_vector_index import LocalVectorIndex
+
+
+class TestLocalVectorIndex:
+    """Test suite for LocalVectorIndex class."""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        return LocalVectorIndex.build(
+            tmp_path,
+            embeddings=[[1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [0.7, 0.7, 0.0]],
+            texts=["FHA", "PMI", "DTI"],
+            metadatas=[{"source": "a.md"}, {"source": "b.md"}, {"source": "c.md"}]
+        )
+
+    def test_search_orders_by_cosine_similarity(self, index):
+        """Test that the closest chunk ranks first regardless of vector length."""
+        results = index.search([0.0, 5.0, 0.0], k=2)
+        assert [doc_id for doc_id, _ in results] == [1, 2]
+        assert results[0][1] == pytest.approx(1.0)
+
+    def test_k_larger_than_corpus(self, index):
+        """Test that asking for more results than chunks returns every chunk."""
+        assert len(index.search([1.0, 0.0, 0.0], k=10)) == 3
+
+    def test_reopen_is_memory_mapped(self, index, tmp_path):
+        """Test that reopening the index maps the persisted matrix read-only."""
+        reopened = LocalVectorIndex(tmp_path)
+        assert isinstance(reopened.embeddings, np.memmap)
+        assert reopened.texts == ["FHA", "PMI", "DTI"]
+        assert reopened.metadatas[1] == {"source": "b.md"}
+        assert reopened.search([1.0, 0.1, 0.0], k=1)[0][0] == 0
+
+    def test_missing_index(self, tmp_path):
+        """Test that opening a missing index raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            LocalVectorIndex(tmp_path / "missing")
+
+    def test_mismatched_embeddings(self, tmp_path):
+        """Test that a wrong number of embeddings is rejected."""
+        with pytest.raises(ValueError):
+            LocalVectorIndex.build(tmp_path, embeddings=[[1.0, 0.0]], texts=["a", "b"], metadatas=[{}, {}])
+
+    def test_large_corpus_without_hnswlib(self, tmp_path, monkeypatch):
+        """Test that building past the HNSW threshold falls back to exact search when hnswlib is missing."""
+        monkeypatch.setitem(sys.modules, "hnswlib", None)
+        index = LocalVectorIndex.build(
+            tmp_path,
+            embeddings=[[1.0, 0.0], [0.0, 1.0]],
+            texts=["a", "b"],
+            metadatas=[{}, {}],
+            hnsw_min_rows=1
+        )
+        assert index.hnsw is None
+        assert index.search([0.0, 1.0], k=1)[0][0] == 1
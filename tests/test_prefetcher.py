@@ -0,0 +1,69 @@
+import threading
+import pytest
+from services.prefetcher import Prefetcher
+
+
+class TestPrefetcher:
+    """Test suite for Prefetcher class."""
+
+    def test_take_returns_result(self):
+        """Test that a claimed prefetch returns the work's result."""
+        prefetcher = Prefetcher(max_workers=2)
+        key = prefetcher.start(lambda: ["doc"])
+        assert prefetcher.take(key) == ["doc"]
+        assert prefetcher.metrics()["used"] == 1
+
+    def test_take_waits_for_running_work(self):
+        """Test that take blocks until the background work finishes."""
+        prefetcher = Prefetcher(max_workers=1)
+        release = threading.Event()
+        key = prefetcher.start(lambda: release.wait(5) and "done")
+        threading.Timer(0.05, release.set).start()
+        assert prefetcher.take(key) == "done"
+
+    def test_result_claimed_once(self):
+        """Test that a result can only be claimed once."""
+        prefetcher = Prefetcher(max_workers=1)
+        key = prefetcher.start(lambda: 1)
+        assert prefetcher.take(key) == 1
+        assert prefetcher.take(key) is None
+
+    def test_discard_cancels_queued_work(self):
+        """Test that discarding work that has not started keeps it from running."""
+        prefetcher = Prefetcher(max_workers=1)
+        release = threading.Event()
+        ran = []
+        blocker = prefetcher.start(lambda: release.wait(5))
+        key = prefetcher.start(lambda: ran.append(True))
+        prefetcher.discard(key)
+        release.set()
+        prefetcher.take(blocker)
+        assert ran == []
+        assert prefetcher.take(key) is None
+        assert prefetcher.metrics()["discarded"] == 1
+
+    def test_error_raised_on_take(self):
+        """Test that an exception in the work is raised to the claimer."""
+        prefetcher = Prefetcher(max_workers=1)
+
+        def fail():
+            raise ValueError("search failed")
+
+        key = prefetcher.start(fail)
+        with pytest.raises(ValueError):
+            prefetcher.take(key)
+
+    def test_unclaimed_results_expire(self):
+        """Test that results nobody claims are dropped after the ttl."""
+        prefetcher = Prefetcher(max_workers=1, ttl=0)
+        prefetcher.start(lambda: 1)
+        prefetcher.start(lambda: 2)
+        metrics = prefetcher.metrics()
+        assert metrics["expired"] == 1
+        assert metrics["pending"] == 1
+
+    def test_disabled(self):
+        """Test that zero workers disables prefetching."""
+        prefetcher = Prefetcher(max_workers=0)
+        assert prefetcher.start(lambda: 1) is None
+        assert prefetcher.take(None) is None
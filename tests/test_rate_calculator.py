@@ -1,4 +1,5 @@
 import pytest
+import random
 from pathlib import Path
 from services.rate_calculator import RateCalculator
 
@@ -176,3 +177,169 @@ class TestRateCalculator:
             loan_term=30
         )
         assert rate == 6.875
+
+    def test_quote_returns_matched_row(self):
+        """Test that a quote carries the matrix row that produced the rate."""
+        calculator = RateCalculator(matrix_path=RATE_MATRIX_PATH)
+
+        quote = calculator.quote(
+            credit_score=760,
+            ltv=60,
+            dti=36,
+            loan_term=30
+        )
+        assert quote.rate == 6.500
+        assert quote.matched_row["min_credit"] == 760
+        assert quote.matched_row["max_ltv"] == 60
+        assert quote.decline_reason is None
+
+    def test_quote_zero_rate_is_not_a_decline(self, tmp_path):
+        """Test that a 0.0 rate is reported as a match, not as missing."""
+        matrix_path = tmp_path / "rate_matrix.csv"
+        matrix_path.write_text("min_credit,max_ltv,max_dti,loan_term,rate\n600,95,50,30,0.000\n")
+        calculator = RateCalculator(matrix_path=matrix_path)
+
+        quote = calculator.quote(credit_score=700, ltv=80, dti=36, loan_term=30)
+        assert quote.rate == 0.0
+        assert quote.decline_reason is None
+
+    def test_quote_decline_reason_low_credit(self):
+        """Test that a credit score below every tier is named as the decline reason."""
+        calculator = RateCalculator(matrix_path=RATE_MATRIX_PATH)
+
+        quote = calculator.quote(credit_score=500, ltv=60, dti=36, loan_term=30)
+        assert quote.rate is None
+        assert quote.matched_row is None
+        assert "credit score" in quote.decline_reason
+
+    def test_quote_decline_reason_invalid_term(self):
+        """Test that an unsupported loan term is named as the decline reason."""
+        calculator = RateCalculator(matrix_path=RATE_MATRIX_PATH)
+
+        quote = calculator.quote(credit_score=760, ltv=60, dti=36, loan_term=20)
+        assert quote.rate is None
+        assert "20-year" in quote.decline_reason
+
+    def test_quote_decline_reason_high_ltv(self):
+        """Test that an LTV above every tier is named as the decline reason."""
+        calculator = RateCalculator(matrix_path=RATE_MATRIX_PATH)
+
+        quote = calculator.quote(credit_score=760, ltv=97, dti=36, loan_term=30)
+        assert quote.rate is None
+        assert "LTV" in quote.decline_reason
+
+    def test_quote_decline_includes_eligibility(self):
+        """Test that a declined quote carries the nearest qualifying tier."""
+        calculator = RateCalculator(matrix_path=RATE_MATRIX_PATH)
+
+        quote = calculator.quote(credit_score=760, ltv=97, dti=36, loan_term=30)
+        assert quote.rate is None
+        assert quote.eligibility.max_ltv == 95
+
+
+class TestMultiDimensionalRateMatrix:
+    """Test suite for rate matrices with extra categorical and range dimensions."""
+
+    MATRIX = (
+        "min_credit,max_ltv,max_dti,loan_term,product,occupancy,min_loan_amount,max_loan_amount,rate\n"
+        "740,80,43,30,conventional,primary,,766550,6.250\n"
+        "740,80,43,30,conventional,*,,766550,6.750\n"
+        "700,95,50,30,conventional,primary,,766550,6.875\n"
+        "740,80,43,30,jumbo,primary,766550,,6.500\n"
+        "620,96.5,50,30,FHA,primary,,,6.000\n"
+        "700,95,50,15,conventional,,,,5.875\n"
+    )
+
+    @pytest.fixture
+    def calculator(self, tmp_path):
+        matrix_path = tmp_path / "rate_matrix.csv"
+        matrix_path.write_text(self.MATRIX)
+        return RateCalculator(matrix_path=matrix_path)
+
+    def test_dimensions_detected(self, calculator):
+        """Test that extra columns are classified as categorical or range dimensions."""
+        assert calculator.categorical_columns == ["product", "occupancy"]
+        assert calculator.dimensions == ["product", "occupancy", "loan_amount"]
+
+    def test_categorical_match_is_case_insensitive(self, calculator):
+        """Test that categorical values match regardless of case."""
+        rate = calculator.calculate(credit_score=680, ltv=90, dti=40, loan_term=30,
+                                    product="fha", occupancy="Primary", loan_amount=300000)
+        assert rate == 6.000
+
+    def test_wildcard_row_applies_to_other_values(self, calculator):
+        """Test that a wildcard occupancy row prices occupancies no row names."""
+        rate = calculator.calculate(credit_score=760, ltv=75, dti=36, loan_term=30,
+                                    product="conventional", occupancy="investment", loan_amount=300000)
+        assert rate == 6.750
+
+    def test_first_row_wins_over_wildcard(self, calculator):
+        """Test that file order still decides between a specific and a wildcard row."""
+        rate = calculator.calculate(credit_score=760, ltv=75, dti=36, loan_term=30,
+                                    product="conventional", occupancy="primary", loan_amount=300000)
+        assert rate == 6.250
+
+    def test_loan_amount_band(self, calculator):
+        """Test that the loan amount selects the conforming or jumbo band."""
+        args = dict(credit_score=760, ltv=75, dti=36, loan_term=30, occupancy="primary")
+        assert calculator.calculate(product="jumbo", loan_amount=900000, **args) == 6.500
+        assert calculator.calculate(product="jumbo", loan_amount=500000, **args) is None
+        assert calculator.calculate(product="conventional", loan_amount=900000, **args) is None
+
+    def test_unknown_product_decline_reason(self, calculator):
+        """Test that an unpriced product is named as the decline reason."""
+        quote = calculator.quote(credit_score=760, ltv=75, dti=36, loan_term=30,
+                                 product="va", occupancy="primary", loan_amount=300000)
+        assert quote.rate is None
+        assert "product" in quote.decline_reason
+        assert "va" in quote.decline_reason
+
+    def test_decline_uses_applicable_rows(self, calculator):
+        """Test that limits in a decline come from the rows for the same product."""
+        quote = calculator.quote(credit_score=760, ltv=97, dti=36, loan_term=30,
+                                 product="conventional", occupancy="primary", loan_amount=300000)
+        assert "95%" in quote.decline_reason
+        assert quote.eligibility.max_ltv == 95
+
+    def test_extra_dimensions_ignored_for_core_matrix(self):
+        """Test that fields the matrix does not price on are ignored."""
+        calculator = RateCalculator(matrix_path=RATE_MATRIX_PATH)
+        rate = calculator.calculate(credit_score=760, ltv=60, dti=36, loan_term=30,
+                                    product="jumbo", occupancy="investment", loan_amount=2000000)
+        assert rate == 6.500
+
+    def test_matches_first_match_scan(self, tmp_path):
+        """Test that the index returns the same row as a scan of the matrix in file order."""
+        rng = random.Random(7)
+        products = ["conventional", "fha", "jumbo", "*"]
+        lines = ["min_credit,max_ltv,max_dti,loan_term,product,min_loan_amount,max_loan_amount,rate"]
+        for _ in range(400):
+            low = rng.choice(["", "100000", "400000"])
+            high = rng.choice(["", "400000", "800000"])
+            lines.append(f"{rng.choice([580, 620, 660, 700, 740])},{rng.choice([80, 90, 95])},"
+                         f"{rng.choice([36, 43, 50])},{rng.choice([15, 30])},{rng.choice(products)},"
+                         f"{low},{high},{rng.uniform(5, 9):.3f}")
+        matrix_path = tmp_path / "rate_matrix.csv"
+        matrix_path.write_text("\n".join(lines) + "\n")
+        calculator = RateCalculator(matrix_path=matrix_path)
+
+        def scan(credit_score, ltv, dti, loan_term, product, loan_amount):
+            for row in calculator.rate_matrix:
+                if (credit_score >= row["min_credit"] and ltv <= row["max_ltv"] and dti <= row["max_dti"]
+                        and loan_term == row["loan_term"]
+                        and row["product"] in (None, product)
+                        and (row["min_loan_amount"] is None or loan_amount >= row["min_loan_amount"])
+                        and (row["max_loan_amount"] is None or loan_amount <= row["max_loan_amount"])):
+                    return row["rate"]
+            return None
+
+        for _ in range(2000):
+            application = dict(
+                credit_score=rng.randint(550, 800),
+                ltv=rng.uniform(70, 100),
+                dti=rng.uniform(30, 55),
+                loan_term=rng.choice([15, 30]),
+                product=rng.choice(["conventional", "fha", "jumbo", "va"]),
+                loan_amount=rng.choice([50000, 100000, 250000, 400000, 600000, 800000, 1000000]),
+            )
+            assert calculator.calculate(**application) == scan(**application)
@@ -0,0 +1,80 @@
+import multiprocessing
+import sqlite3
+import pytest
+from services.response_cache import ResponseCache
+
+
+def write_entries(path, start):
+    cache = ResponseCache(path)
+    for i in range(start, start + 50):
+        cache.put(f"key-{i}", f"value-{i}")
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache class."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return ResponseCache(tmp_path / "cache.sqlite3", max_entries=3, evict_every=1)
+
+    def test_miss_then_hit(self, cache):
+        """Test that a stored response is returned for the same key."""
+        assert cache.get("key") is None
+        cache.put("key", "750")
+        assert cache.get("key") == "750"
+        assert cache.metrics() == {"hits": 1, "misses": 1, "evictions": 0, "errors": 0}
+
+    def test_key_covers_template_input_and_model(self):
+        """Test that changing any part of the call changes the key."""
+        key = ResponseCache.make_key("Extract the credit score", {"input": "750"}, "gpt-4-turbo")
+
+        assert key == ResponseCache.make_key("Extract the credit score", {"input": "750"}, "gpt-4-turbo")
+        assert key != ResponseCache.make_key("Extract the home value", {"input": "750"}, "gpt-4-turbo")
+        assert key != ResponseCache.make_key("Extract the credit score", {"input": "751"}, "gpt-4-turbo")
+        assert key != ResponseCache.make_key("Extract the credit score", {"input": "750"}, "gpt-4o")
+
+    def test_evicts_least_recently_used(self, cache):
+        """Test that the size cap drops the least recently read entries first."""
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.put("c", "3")
+        cache.get("a")
+        cache.put("d", "4")
+
+        assert len(cache) == 3
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("d") == "4"
+        assert cache.metrics()["evictions"] == 1
+
+    def test_database_errors_are_misses(self, cache):
+        """Test that a failing database reads as a miss and skips writes instead of raising."""
+        cache.put("key", "750")
+        with sqlite3.connect(cache.path) as conn:
+            conn.execute("DROP TABLE responses")
+
+        assert cache.get("key") is None
+        cache.put("key", "750")
+        assert cache.metrics()["errors"] == 2
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that a new instance (e.g. another worker) sees stored responses."""
+        path = tmp_path / "cache.sqlite3"
+        ResponseCache(path).put("key", "yes")
+        assert ResponseCache(path).get("key") == "yes"
+
+    def test_shared_across_processes(self, tmp_path):
+        """Test that concurrent writers in separate processes share one database."""
+        path = tmp_path / "cache.sqlite3"
+        ResponseCache(path)
+
+        processes = [multiprocessing.Process(target=write_entries, args=(path, start)) for start in (0, 50, 100)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert all(process.exitcode == 0 for process in processes)
+        cache = ResponseCache(path)
+        assert len(cache) == 150
+        assert cache.get("key-120") == "value-120"
@@ -0,0 +1,31 @@
+import threading
+import time
+
+import retriever
+
+
+class TestLazyInitialization:
+    """Test suite for the shared indexes loaded on first use."""
+
+    def test_concurrent_first_calls_load_once(self, monkeypatch):
+        """Test that threads racing the first load all get the index, and it is loaded once."""
+        loads = []
+
+        def slow_load(path):
+            loads.append(path)
+            time.sleep(0.05)
+            return "index"
+
+        monkeypatch.setattr(retriever.BM25Index, "load", staticmethod(slow_load))
+        monkeypatch.setattr(retriever, "_lexical_index", None)
+        monkeypatch.setattr(retriever, "_lexical_index_checked", False)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(retriever.get_lexical_index())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["index"] * 8
+        assert len(loads) == 1
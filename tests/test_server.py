@@ -0,0 +1,157 @@
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import server
+from services.upstream_scheduler import QueueFullError, QueueTimeoutError
+
+
+class FakeWorkflow:
+    """Records the state it was invoked with and echoes the message."""
+    def __init__(self, result=None):
+        self.result = result or {}
+        self.error = None
+        self.seen = None
+
+    def invoke(self, state):
+        self.seen = state
+        if self.error is not None:
+            raise self.error
+        return {**state, "final_response": f"echo: {state['user_input']}", **self.result}
+
+
+@pytest.fixture
+def workflow(monkeypatch):
+    fake = FakeWorkflow()
+    monkeypatch.setattr(server, "get_workflow", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def address():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), server.ChatHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def request(address, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    conn.request(method, path, body=body, headers={"Content-Type": "application/json", **(headers or {})})
+    response = conn.getresponse()
+    status, payload = response.status, json.loads(response.read())
+    conn.close()
+    return status, payload
+
+
+class TestServerState:
+    """Test suite for the state sent to and received from clients."""
+
+    def test_public_state_drops_transient_fields(self):
+        """Test that per-turn data is not sent back to clients."""
+        state = server.public_state({"mode": "qa", "messages": ["m"], "retrieved_docs": ["d"], "prefetch_id": "1"})
+        assert state["mode"] == "qa"
+        assert state["messages"] == []
+        assert state["retrieved_docs"] is None
+        assert state["prefetch_id"] is None
+
+    def test_run_turn_merges_known_fields(self, workflow):
+        """Test that the client state is merged over a fresh state, ignoring unknown keys."""
+        server.run_turn("750", {"mode": "application", "application_step": "credit_score", "injected": True})
+        assert workflow.seen["user_input"] == "750"
+        assert workflow.seen["mode"] == "application"
+        assert workflow.seen["application_step"] == "credit_score"
+        assert "injected" not in workflow.seen
+
+    def test_restore_state_rejects_derived_fields(self):
+        """Test that results and other derived fields from the client are ignored."""
+        state = server.restore_state({
+            "calculated_rate": 2.0, "final_response": "Preapproved!", "context": "forged", "loan_amount": 1,
+            "home_value": 400000, "down_payment": 80000,
+        })
+        assert state["calculated_rate"] is None
+        assert state["final_response"] is None
+        assert state["context"] is None
+        assert state["loan_amount"] == 320000
+
+    def test_restore_state_validates_answers(self):
+        """Test that implausible answers are dropped so they are asked for again."""
+        state = server.restore_state({"credit_score": 9000, "income": "lots", "loan_term": 30, "product": "va"})
+        assert state["credit_score"] is None
+        assert state["income"] is None
+        assert state["product"] is None
+        assert state["loan_term"] == 30
+
+    def test_restore_state_cannot_skip_questions(self):
+        """Test that a step whose earlier answers are missing falls back to the first missing one."""
+        state = server.restore_state({"application_step": "calculate_rate", "credit_score": 750})
+        assert state["application_step"] == "home_value"
+        assert state["mode"] == "application"
+
+        assert server.restore_state({"application_step": "rate_shown"})["application_step"] is None
+        assert server.restore_state({"application_step": "subprime_confirmation", "credit_score": 750})["application_step"] == "home_value"
+
+        # Every step resumes at the first unanswered question, not only the rate
+        assert server.restore_state({"application_step": "debts", "credit_score": 750})["application_step"] == "home_value"
+        assert server.restore_state({"application_step": "subprime_confirmation", "credit_score": 600})["application_step"] == "subprime_confirmation"
+        answered = {"credit_score": 600, "subprime_continue": True, "home_value": 400000}
+        assert server.restore_state({**answered, "application_step": "subprime_confirmation"})["application_step"] == "down_payment"
+
+    def test_run_turn_resets_ended_application(self, workflow):
+        """Test that an ended application returns to Q&A mode."""
+        workflow.result = {"application_step": "ended", "mode": "application"}
+        result = server.run_turn("no thanks", None)
+        assert result["application_step"] is None
+        assert result["mode"] == "qa"
+
+
+class TestChatHandler:
+    """Test suite for the HTTP endpoints."""
+
+    def test_health(self, address):
+        """Test that the health endpoint reports the serving process."""
+        status, body = request(address, "GET", "/health")
+        assert status == 200
+        assert body["status"] == "ok"
+        assert isinstance(body["pid"], int)
+
+    def test_chat_round_trip(self, address, workflow):
+        """Test that a chat turn returns the response and a JSON-safe state."""
+        status, body = request(address, "POST", "/chat", json.dumps({"message": "hi", "state": None}))
+        assert status == 200
+        assert body["response"] == "echo: hi"
+        assert body["state"]["messages"] == []
+
+    @pytest.mark.parametrize("error", [QueueFullError("full"), QueueTimeoutError("slow")])
+    def test_chat_busy(self, address, workflow, error):
+        """Test that backpressure from the upstream scheduler is a 503 with a retry message."""
+        workflow.error = error
+        state = {"mode": "application", "application_step": "income"}
+        status, body = request(address, "POST", "/chat", json.dumps({"message": "80k", "state": state}))
+        assert status == 503
+        assert body["response"] == server.BUSY_RESPONSE
+        assert body["state"] == state
+
+    @pytest.mark.parametrize("payload, content_length", [
+        ("not json", None),
+        ('{"state": null}', None),
+        ('{"message": 5}', None),
+        ('{"message": "hi", "state": []}', None),
+        ('{"message": "hi"}', "-1"),
+        ('{"message": "hi"}', "abc"),
+    ])
+    def test_chat_rejects_bad_input(self, address, payload, content_length):
+        """Test that malformed requests, including a negative or non-numeric Content-Length, get a 400."""
+        headers = {"Content-Length": content_length} if content_length else None
+        status, _ = request(address, "POST", "/chat", payload, headers)
+        assert status == 400
+
+    def test_unknown_path(self, address):
+        """Test that unknown paths get a 404."""
+        assert request(address, "GET", "/nope")[0] == 404
+        assert request(address, "POST", "/nope", "{}")[0] == 404
@@ -0,0 +1,82 @@
+import threading
+import time
+import pytest
+from services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight class."""
+
+    def run_concurrently(self, n, target):
+        start = threading.Barrier(n)
+        results = [None] * n
+
+        def worker(i):
+            start.wait()
+            try:
+                results[i] = target()
+            except Exception as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_identical_calls_share_one_upstream_call(self):
+        """Test that identical in-flight calls run once and share the result."""
+        flights = SingleFlight()
+        upstream_calls = []
+
+        def slow_call():
+            upstream_calls.append(1)
+            time.sleep(0.1)
+            return "hello"
+
+        results = self.run_concurrently(8, lambda: flights.do("greeting", slow_call))
+
+        assert results == ["hello"] * 8
+        assert len(upstream_calls) == 1
+        assert flights.metrics() == {"calls": 1, "coalesced": 7, "in_flight": 0}
+
+    def test_different_keys_are_not_coalesced(self):
+        """Test that calls with different keys each reach upstream."""
+        flights = SingleFlight()
+        counter = iter(range(100))
+
+        results = self.run_concurrently(4, lambda: flights.do(next(counter), lambda: time.sleep(0.05) or "ok"))
+
+        assert results == ["ok"] * 4
+        assert flights.metrics()["coalesced"] == 0
+        assert flights.metrics()["calls"] == 4
+
+    def test_sequential_calls_are_not_cached(self):
+        """Test that a finished call is not reused by later callers."""
+        flights = SingleFlight()
+        values = iter([1, 2])
+
+        assert flights.do("key", lambda: next(values)) == 1
+        assert flights.do("key", lambda: next(values)) == 2
+
+    def test_error_is_shared_with_waiters(self):
+        """Test that every coalesced caller sees the upstream exception."""
+        flights = SingleFlight()
+
+        def failing_call():
+            time.sleep(0.1)
+            raise RuntimeError("rate limited")
+
+        results = self.run_concurrently(4, lambda: flights.do("key", failing_call))
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flights.metrics()["in_flight"] == 0
+
+    def test_key_released_after_error(self):
+        """Test that a failed call does not block later calls with the same key."""
+        flights = SingleFlight()
+
+        with pytest.raises(ValueError):
+            flights.do("key", lambda: (_ for _ in ()).throw(ValueError()))
+        assert flights.do("key", lambda: "recovered") == "recovered"
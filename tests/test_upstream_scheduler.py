@@ -0,0 +1,176 @@
+import threading
+import time
+import pytest
+from services.upstream_scheduler import (
+    UpstreamScheduler, TokenBucket, QueueFullError, QueueTimeoutError, UpstreamBusyError, PRIORITY_APPLICATION, PRIORITY_QA
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Test suite for TokenBucket class."""
+
+    def test_burst_then_refill(self):
+        """Test that the bucket allows a burst and then refills at the configured rate."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+        assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+        assert bucket.try_acquire() == pytest.approx(0.5)
+
+        clock.now = 0.5
+        assert bucket.try_acquire() == 0
+
+    def test_capacity_caps_refill(self):
+        """Test that idle time does not accumulate more than capacity."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+        clock.now = 100
+
+        assert [bucket.try_acquire() for _ in range(2)] == [0, 0]
+        assert bucket.try_acquire() > 0
+
+
+class FakeUpstream:
+    """Records peak concurrency of calls made through the scheduler."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.order = []
+
+    def call(self, label):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.order.append(label)
+        time.sleep(self.latency)
+        with self.lock:
+            self.active -= 1
+        return label
+
+
+class TestUpstreamScheduler:
+    """Test suite for UpstreamScheduler class."""
+
+    def test_bounds_in_flight_calls(self):
+        """Test that no more than max_in_flight calls run at once."""
+        scheduler = UpstreamScheduler(max_in_flight=3, requests_per_second=1000, burst=1000)
+        upstream = FakeUpstream(latency=0.05)
+
+        threads = [
+            threading.Thread(target=scheduler.submit, args=("gpt", PRIORITY_QA, lambda i=i: upstream.call(i)))
+            for i in range(12)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert upstream.peak == 3
+        assert len(upstream.order) == 12
+        assert scheduler.metrics()["in_flight"] == 0
+
+    def test_application_calls_overtake_qa(self):
+        """Test that queued application calls are admitted before queued Q&A calls."""
+        scheduler = UpstreamScheduler(max_in_flight=1, requests_per_second=1000, burst=1000)
+        upstream = FakeUpstream(latency=0.05)
+
+        # Occupy the only slot, then queue Q&A before application calls
+        blocker = threading.Thread(target=scheduler.submit, args=("gpt", PRIORITY_QA, lambda: upstream.call("blocker")))
+        blocker.start()
+        time.sleep(0.01)
+
+        threads = []
+        for label, priority in [("qa1", PRIORITY_QA), ("qa2", PRIORITY_QA), ("app1", PRIORITY_APPLICATION), ("app2", PRIORITY_APPLICATION)]:
+            thread = threading.Thread(target=scheduler.submit, args=("gpt", priority, lambda label=label: upstream.call(label)))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.005)
+
+        for thread in [blocker] + threads:
+            thread.join()
+
+        assert upstream.order == ["blocker", "app1", "app2", "qa1", "qa2"]
+        waits = scheduler.metrics()["wait_seconds"]
+        assert waits[PRIORITY_APPLICATION]["mean"] < waits[PRIORITY_QA]["mean"]
+
+    def test_rate_limit_spaces_calls(self):
+        """Test that calls beyond the burst wait for tokens."""
+        scheduler = UpstreamScheduler(max_in_flight=10, requests_per_second=20, burst=2)
+
+        start = time.monotonic()
+        for _ in range(4):
+            scheduler.submit("gpt", PRIORITY_QA, lambda: None)
+        elapsed = time.monotonic() - start
+
+        # Two calls from the burst, then two more at 20/s
+        assert elapsed >= 0.09
+
+    def test_rate_limits_are_per_model(self):
+        """Test that an exhausted model does not hold back another model."""
+        scheduler = UpstreamScheduler(max_in_flight=10, requests_per_second=0.1, burst=1)
+        scheduler.submit("gpt-4", PRIORITY_QA, lambda: None)
+
+        start = time.monotonic()
+        scheduler.submit("gpt-3.5", PRIORITY_QA, lambda: None)
+        assert time.monotonic() - start < 0.05
+
+    def test_rejects_when_queue_full(self):
+        """Test backpressure: calls beyond max_queue are rejected immediately."""
+        scheduler = UpstreamScheduler(max_in_flight=1, requests_per_second=1000, burst=1000, max_queue=1)
+        release = threading.Event()
+
+        running = threading.Thread(target=scheduler.submit, args=("gpt", PRIORITY_QA, release.wait))
+        running.start()
+        time.sleep(0.01)
+        queued = threading.Thread(target=scheduler.submit, args=("gpt", PRIORITY_QA, lambda: None))
+        queued.start()
+        time.sleep(0.01)
+
+        with pytest.raises(QueueFullError):
+            scheduler.submit("gpt", PRIORITY_QA, lambda: None)
+
+        release.set()
+        running.join()
+        queued.join()
+        assert scheduler.metrics()["rejected"] == 1
+        assert scheduler.metrics()["max_queue_depth"] == 1
+
+    def test_queue_timeout(self):
+        """Test that a call not admitted in time raises QueueTimeoutError and leaves the queue."""
+        scheduler = UpstreamScheduler(max_in_flight=1, requests_per_second=1000, burst=1000)
+        release = threading.Event()
+        running = threading.Thread(target=scheduler.submit, args=("gpt", PRIORITY_QA, release.wait))
+        running.start()
+        time.sleep(0.01)
+
+        with pytest.raises(QueueTimeoutError):
+            scheduler.submit("gpt", PRIORITY_QA, lambda: None, timeout=0.05)
+
+        release.set()
+        running.join()
+        assert scheduler.metrics()["queue_depth"] == 0
+
+    def test_backpressure_errors_share_a_base(self):
+        """Test that callers can handle a full queue and a queue timeout together."""
+        assert issubclass(QueueFullError, UpstreamBusyError)
+        assert issubclass(QueueTimeoutError, UpstreamBusyError)
+        assert issubclass(QueueTimeoutError, TimeoutError)
+
+    def test_slot_released_on_error(self):
+        """Test that a failing call frees its in-flight slot."""
+        scheduler = UpstreamScheduler(max_in_flight=1)
+
+        with pytest.raises(ValueError):
+            scheduler.submit("gpt", PRIORITY_QA, lambda: (_ for _ in ()).throw(ValueError()))
+        assert scheduler.submit("gpt", PRIORITY_QA, lambda: "ok") == "ok"
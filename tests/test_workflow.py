@@ -0,0 +1,166 @@
+import json
+import pytest
+from langchain_core.messages import AIMessage
+
+import workflow
+from services.rate_calculator import RateCalculator
+from tools import rate_tool
+
+
+# Kept before the autouse fixture replaces it
+llm_extract_application = workflow.llm_extract_application
+
+
+class FakeChain:
+    def __init__(self, response):
+        self.response = response
+
+    def invoke(self, inputs):
+        return AIMessage(content=json.dumps(self.response))
+
+
+def apply_turn(state, text):
+    """Run one application answer through the extraction and step processor, as the graph does."""
+    state["user_input"] = text
+    workflow.check_app_step(state)
+    step = workflow.route_by_app_step(state)
+    return getattr(workflow, step)(state)
+
+
+@pytest.fixture(autouse=True)
+def no_llm(monkeypatch):
+    """Fail the test if extraction falls back to the model."""
+    def llm_extract_application(text, expected=None):
+        raise AssertionError(f"Unexpected LLM extraction for {text!r}")
+    monkeypatch.setattr(workflow, "llm_extract_application", llm_extract_application)
+
+
+@pytest.fixture
+def priced_by_product(monkeypatch, tmp_path):
+    matrix_path = tmp_path / "rate_matrix.csv"
+    matrix_path.write_text(
+        "min_credit,max_ltv,max_dti,loan_term,product,rate\n"
+        "700,80,43,30,conventional,6.5\n"
+        "700,80,43,30,fha,6.25\n"
+    )
+    monkeypatch.setattr(rate_tool, "_calculator", RateCalculator(matrix_path=matrix_path))
+
+
+class TestApplicationFields:
+    """Test suite for which application fields are asked for."""
+
+    def test_unpriced_dimensions_not_asked(self):
+        """Test that product and occupancy are skipped when the rate sheet does not price on them."""
+        assert workflow.application_fields() == ["credit_score", "home_value", "down_payment", "income", "debts", "loan_term"]
+
+        state = workflow.initial_state()
+        state["application_step"] = "loan_term"
+        state.update(credit_score=750, home_value=400000, down_payment=80000, loan_amount=320000, income=120000, debts=1500.0)
+        state = apply_turn(state, "30")
+        assert state["application_step"] == "calculate_rate"
+        assert "Product" not in state["final_response"]
+
+    def test_priced_dimension_asked(self, priced_by_product):
+        """Test that a dimension the rate sheet prices on is asked for after the loan term."""
+        assert "product" in workflow.application_fields()
+        assert "occupancy" not in workflow.application_fields()
+
+        state = workflow.initial_state()
+        state["application_step"] = "loan_term"
+        state.update(credit_score=750, home_value=400000, down_payment=80000, loan_amount=320000, income=120000, debts=1500.0)
+        state = apply_turn(state, "30")
+        assert state["application_step"] == "product"
+        state = apply_turn(state, "FHA")
+        assert state["application_step"] == "calculate_rate"
+        assert "Product: FHA" in state["final_response"]
+
+
+class TestApplicationFlow:
+    """Test suite for the application steps."""
+
+    def run_application(self, state):
+        state["user_input"] = "I want to apply"
+        state = workflow.start_application(state)
+        assert state["application_step"] == "credit_score"
+        for answer in ["750", "$400,000", "20%", "$120,000", "1500", "30"]:
+            state = apply_turn(state, answer)
+        assert state["application_step"] == "calculate_rate"
+        return workflow.calculate_rate(state)
+
+    def test_applications_back_to_back(self):
+        """Test that a second application in the same conversation asks every question again."""
+        state = self.run_application(workflow.initial_state())
+        assert state["application_step"] == "ended"
+        assert state["calculated_rate"] is not None
+
+        # What app.py and server.py do when an application ends
+        state["application_step"] = None
+        state["mode"] = "qa"
+
+        state["user_input"] = "I want to apply again"
+        state = workflow.start_application(state)
+        assert state["application_step"] == "credit_score"
+        assert state["credit_score"] is None
+        assert state["loan_term"] is None
+        assert state["down_payment_percent"] is None
+        assert state["calculated_rate"] is None
+
+        state = self.run_application(state)
+        assert state["application_step"] == "ended"
+
+    def test_correction_overwrites_earlier_answer(self):
+        """Test that an explicit correction replaces a stored answer while another question is open."""
+        state = workflow.initial_state()
+        state["application_step"] = "income"
+        state.update(credit_score=750, home_value=400000, down_payment_percent=20.0, down_payment=80000, loan_amount=320000)
+
+        state = apply_turn(state, "$120,000, and actually my score is 700")
+        assert state["credit_score"] == 700
+        assert state["income"] == 120000
+        assert state["application_step"] == "debts"
+
+        state = apply_turn(state, "1500, and sorry, the house is actually $500k")
+        assert state["home_value"] == 500000
+        # A percentage down payment follows the corrected home value
+        assert state["down_payment"] == 100000
+        assert state["loan_amount"] == 400000
+
+    def test_unrequested_answer_not_overwritten_without_correction(self):
+        """Test that a number for another field does not replace its answer unless corrected."""
+        state = workflow.initial_state()
+        state["application_step"] = "home_value"
+        state["credit_score"] = 750
+        state = apply_turn(state, "$400k house with a 700 score")
+        assert state["credit_score"] == 750
+        assert state["home_value"] == 400000
+
+
+class TestLLMExtraction:
+    """Test suite for the structured LLM fallback."""
+
+    def test_implausible_values_dropped(self, monkeypatch):
+        """Test that model output goes through the same checks as local parsing."""
+        response = {
+            "credit_score": 9000, "home_value": 50, "income": 120000, "debts": -20,
+            "down_payment_percent": 150, "loan_term": 20, "product": "va", "occupancy": "second_home",
+        }
+        monkeypatch.setattr(workflow, "cached_chain", lambda prompt, priority: FakeChain(response))
+        assert llm_extract_application("...", "credit_score") == {"income": 120000, "occupancy": "second_home"}
+
+
+class TestRateLookup:
+    """Test suite for pricing the collected application."""
+
+    @pytest.mark.parametrize("percent", [20, 5])
+    def test_percentage_down_payment_on_tier_boundary(self, percent):
+        """Test that an exact-percentage down payment prices in its tier despite whole-dollar truncation."""
+        state = workflow.initial_state()
+        state.update(credit_score=760, home_value=333333, income=150000, debts=500.0, loan_term=30)
+        workflow.apply_application_fields(state, {"down_payment_percent": float(percent)})
+        assert state["down_payment"] < percent / 100 * 333333
+
+        state = workflow.calculate_rate(state)
+        expected = rate_tool.get_rate_calculator().calculate(760, 100 - percent, 4.0, 30)
+        assert expected is not None
+        assert state["calculated_rate"] == expected
+        assert "Increase your down payment" not in state["final_response"]
@@ -1,7 +1,60 @@
-from langchain.tools import Tool
+from langchain.tools import Tool, StructuredTool
 from pathlib import Path
-from services.rate_calculator import RateCalculator
-from typing import Dict, Any
+from pydantic import BaseModel, Field
+from services.rate_calculator import RateCalculator, RateQuote
+from typing import Dict, Any, Optional
+
+RATE_MATRIX_PATH = Path(__file__).parent.parent / "docs" / "rate_matrix.csv"
+
+_calculator: Optional[RateCalculator] = None
+
+def get_rate_calculator() -> RateCalculator:
+    """Return the shared RateCalculator, loading the rate matrix on first use."""
+    global _calculator
+    if _calculator is None:
+        _calculator = RateCalculator(matrix_path=RATE_MATRIX_PATH)
+    return _calculator
+
+class RateQuoteInput(BaseModel):
+    """Input schema for the structured rate quote tool."""
+    credit_score: int = Field(description="Applicant's credit score (e.g., 760)")
+    ltv: float = Field(description="Loan-to-value ratio as percentage (e.g., 80 for 80%)")
+    dti: float = Field(description="Debt-to-income ratio as percentage (e.g., 43 for 43%)")
+    loan_term: int = Field(description="Loan term in years, either 15 or 30")
+    product: Optional[str] = Field(default=None, description="Loan product (e.g., conventional, fha, jumbo)")
+    occupancy: Optional[str] = Field(default=None, description="Occupancy (e.g., primary, second_home, investment)")
+    loan_amount: Optional[float] = Field(default=None, description="Loan amount in dollars (e.g., 320000)")
+
+def get_rate_quote(credit_score: int, ltv: float, dti: float, loan_term: int, product: Optional[str] = None,
+                   occupancy: Optional[str] = None, loan_amount: Optional[float] = None) -> RateQuote:
+    return get_rate_calculator().quote(
+        credit_score=credit_score,
+        ltv=ltv,
+        dti=dti,
+        loan_term=loan_term,
+        product=product,
+        occupancy=occupancy,
+        loan_amount=loan_amount
+    )
+
+def format_rate_quote(quote: RateQuote, include_limits: bool = True) -> str:
+    """Render a RateQuote as the prose reply shown to borrowers and LLM agents."""
+    if quote.rate is not None:
+        return f"The estimated interest rate is {quote.rate:.3f}%"
+
+    reply = f"Unfortunately, no matching rate was found for the provided criteria. {quote.decline_reason}"
+    eligibility = quote.eligibility
+    if include_limits and eligibility is not None:
+        limits = []
+        if eligibility.max_ltv is not None:
+            limits.append(f"LTV up to {eligibility.max_ltv:g}%")
+        if eligibility.max_dti is not None:
+            limits.append(f"DTI up to {eligibility.max_dti:g}%")
+        if eligibility.min_credit is not None:
+            limits.append(f"credit score of at least {eligibility.min_credit}")
+        if limits:
+            reply += f" Nearest qualifying limits (changing one factor at a time): {', '.join(limits)}."
+    return reply
 
 def calculate_mortgage_rate(input_data: str) -> str:
     try:
@@ -10,29 +63,26 @@ def calculate_mortgage_rate(input_data: str) -> str:
         if len(parts) != 4:
             return "Error: Invalid input format. Expected: credit_score,ltv,dti,loan_term"
 
-        credit_score = int(parts[0])
-        ltv = float(parts[1])
-        dti = float(parts[2])
-        loan_term = int(parts[3])
-
-        # Calculate rate
-        rate_matrix_path = Path(__file__).parent.parent / "docs" / "rate_matrix.csv"
-        calculator = RateCalculator(matrix_path=rate_matrix_path)
-        rate = calculator.calculate(
-            credit_score=credit_score,
-            ltv=ltv,
-            dti=dti,
-            loan_term=loan_term
+        quote = get_rate_quote(
+            credit_score=int(parts[0]),
+            ltv=float(parts[1]),
+            dti=float(parts[2]),
+            loan_term=int(parts[3])
         )
-
-        if rate:
-            return f"The estimated interest rate is {rate:.3f}%"
-        else:
-            return "Unfortunately, no matching rate was found for the provided criteria. The LTV or DTI may be outside our lending guidelines."
+        return format_rate_quote(quote)
 
     except Exception as e:
         return f"Error calculating rate: {str(e)}"
 
+# Structured form for the workflow: typed input, RateQuote output
+rate_quote_tool = StructuredTool.from_function(
+    func=get_rate_quote,
+    name="GetMortgageRateQuote",
+    description="Look up the mortgage interest rate for an applicant. Returns the rate, the matched rate matrix row and the reason for any decline.",
+    args_schema=RateQuoteInput
+)
+
+# Text form for LLM agents
 rate_calculation_tool = Tool(
     name="CalculateMortgageRate",
     func=calculate_mortgage_rate,
@@ -1,13 +1,19 @@
 from typing import TypedDict, List, Optional, Literal
 from pathlib import Path
-from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from retriever import get_retriever
-from tools.rate_tool import rate_calculation_tool
+from llm import get_llm, get_chat_model, cached_chain, PRIORITY_APPLICATION, PRIORITY_ROUTING, PRIORITY_QA
+from retriever import (
+    get_retriever, get_vector_store, get_lexical_index, get_faq_index, match_faq,
+    prefetch_documents, take_prefetched_documents, prefetch_faq, take_prefetched_faq, discard_prefetch
+)
+from services.context_assembly import assemble_context
+from services.application_parser import (
+    APPLICATION_FIELDS, is_correction, is_valid_field, parse_application
+)
+import json
+import math
 import os
-import re
 
 if os.getenv("LANGCHAIN_TRACING_V2"):
     print("[INFO] LangSmith tracing is enabled")
@@ -26,6 +32,10 @@ class AgentState(TypedDict):
     # Retrieved context
     retrieved_docs: Optional[List]
     context: Optional[str]
+    context_stats: Optional[dict]
+    prefetch_id: Optional[str]
+    faq_prefetch_id: Optional[str]
+    faq_match: Optional[dict]
 
     # Application data
     credit_score: Optional[int]
@@ -35,6 +45,9 @@ class AgentState(TypedDict):
     income: Optional[int]
     debts: Optional[float]
     loan_term: Optional[int]
+    down_payment_percent: Optional[float]
+    product: Optional[str]
+    occupancy: Optional[str]
     application_step: Optional[str]
     subprime_continue: Optional[bool]
 
@@ -42,44 +55,226 @@ class AgentState(TypedDict):
     final_response: Optional[str]
     calculated_rate: Optional[float]
 
-# Initialize LLM
-llm = ChatOpenAI(model="gpt-4-turbo", temperature=0)
-
-# Helper function
-def extract_number(text: str, field_name: str) -> Optional[float]:
-    """Extract a number from text using LLM."""
+def initial_state() -> AgentState:
+    """Return the state for a new conversation."""
+    return {
+        "user_input": "",
+        "messages": [],
+        "mode": "qa",
+        "intent": None,
+        "retrieved_docs": None,
+        "context": None,
+        "context_stats": None,
+        "prefetch_id": None,
+        "faq_prefetch_id": None,
+        "faq_match": None,
+        "credit_score": None,
+        "home_value": None,
+        "down_payment": None,
+        "loan_amount": None,
+        "income": None,
+        "debts": None,
+        "loan_term": None,
+        "down_payment_percent": None,
+        "product": None,
+        "occupancy": None,
+        "application_step": None,
+        "subprime_continue": None,
+        "final_response": None,
+        "calculated_rate": None
+    }
+
+# Documents retrieved per question
+RETRIEVAL_K = 3
+
+# Maximum tokens of retrieved context sent to the relevance and answer prompts
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+# The question asked for each application field
+APPLICATION_QUESTIONS = {
+    "credit_score": "What is your credit score?",
+    "home_value": "What is the estimated home value/price?",
+    "down_payment": "How much down payment can you make?",
+    "income": "What is your annual income?",
+    "debts": "What are your total monthly debt payments?",
+    "loan_term": "What loan term do you prefer? (15 or 30 years)",
+    "product": "Which loan product are you interested in? (conventional, FHA, or jumbo)",
+    "occupancy": "Will the home be your primary residence, a second home, or an investment property?",
+}
+
+# Everything collected or derived during an application; cleared when a new one starts
+APPLICATION_STATE_FIELDS = APPLICATION_FIELDS + ["loan_amount", "down_payment_percent", "subprime_continue", "calculated_rate"]
+
+# Asked only when the rate sheet prices on them; other fields are always asked
+PRICING_DIMENSION_FIELDS = ("product", "occupancy")
+
+# Sent instead of an answer when the upstream scheduler turns the turn away under load
+BUSY_RESPONSE = "We're handling a lot of requests right now. Please try sending your message again in a moment."
+
+# Compiled once per process, on first use
+_workflow = None
+
+# Helper functions
+def extract_application_fields(text: str, expected: Optional[str] = None) -> dict:
+    """
+    Extract every application field stated in a message.
+
+    Local parsing runs first; the LLM is asked, once for all fields, only when the
+    field that was asked for was not found or some numbers could not be attributed.
+    """
+    parsed = parse_application(text, expected)
+    fields = parsed.fields
+    found_expected = expected in fields or (expected == "down_payment" and "down_payment_percent" in fields)
+    if (expected is not None and not found_expected) or parsed.leftover:
+        for field, value in llm_extract_application(text, expected).items():
+            fields.setdefault(field, value)
+    return fields
+
+def llm_extract_application(text: str, expected: Optional[str] = None) -> dict:
+    """Extract every application field from a message in one structured LLM call."""
     prompt = ChatPromptTemplate.from_messages([
-        ("system", f"""You are a data extraction assistant. Extract the {field_name} from the user's message.
+        ("system", """You are a data extraction assistant for a mortgage application. Extract every field the user states.
+
+        The user was just asked: "{question}" A bare answer (e.g. "750" or "about 100000") answers that question.
 
-        IMPORTANT: Return ONLY the numeric value as digits. No words, no explanations, no units.
-        If you cannot find a {field_name}, respond with 'NONE'.
+        Return ONLY a JSON object with these keys, using null for anything not stated:
+        - "credit_score": integer
+        - "home_value": dollars, number
+        - "down_payment": dollars, number (if given as an amount)
+        - "down_payment_percent": number (if given as a percentage, e.g. 20 for 20%)
+        - "income": annual income in dollars, number (convert monthly income to annual)
+        - "debts": total monthly debt payments in dollars, number
+        - "loan_term": 15 or 30
+        - "product": "conventional", "fha" or "jumbo"
+        - "occupancy": "primary", "second_home" or "investment"
 
         Examples:
-        - "I want $500,000" -> 500000
-        - "My credit score is 750" -> 750
-        - "about 100000" -> 100000
-        - "1000" -> 1000
-        - "Its about 1000" -> 1000
-        - "$1,000" -> 1000
-        - "I don't know" -> NONE"""),
+        - "750 score, $400k house, 20% down" -> {{"credit_score": 750, "home_value": 400000, "down_payment_percent": 20}}
+        - "fifty thousand" (asked for the down payment) -> {{"down_payment": 50000}}
+        - "I don't know" -> {{}}"""),
         ("human", "{input}")
     ])
 
-    chain = prompt | llm
-    result = chain.invoke({"input": text})
+    chain = cached_chain(prompt, PRIORITY_APPLICATION)
+    question = APPLICATION_QUESTIONS.get(expected, "Tell me about the home and your finances.")
+    result = chain.invoke({"input": text, "question": question})
 
-    response = result.content.strip()
+    response = result.content.strip().strip("`")
+    if response.startswith("json"):
+        response = response[4:]
+    try:
+        raw = json.loads(response)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(raw, dict):
+        return {}
+
+    fields = {}
+    for field in ("credit_score", "home_value", "down_payment", "income", "loan_term"):
+        try:
+            if raw.get(field) is not None:
+                fields[field] = int(float(raw[field]))
+        except (TypeError, ValueError):
+            pass
+    for field in ("down_payment_percent", "debts"):
+        try:
+            if raw.get(field) is not None:
+                fields[field] = float(raw[field])
+        except (TypeError, ValueError):
+            pass
+    for field in ("product", "occupancy"):
+        if raw.get(field) is not None:
+            fields[field] = raw[field]
+    # The same checks as local parsing, so an implausible value is asked for again instead of stored
+    return {field: value for field, value in fields.items() if is_valid_field(field, value)}
+
+def apply_application_fields(state: AgentState, fields: dict, overwrite=()) -> None:
+    """
+    Store extracted fields the application is still missing.
+
+    Answers already given are kept unless listed in overwrite: the field that was
+    just asked for, or every field in the message when the borrower is correcting one.
+    """
+    for field in ("credit_score", "home_value", "income", "debts", "loan_term", "product", "occupancy"):
+        if fields.get(field) is not None and (state.get(field) is None or field in overwrite):
+            state[field] = fields[field]
+
+    if state.get("down_payment") is None or {"down_payment", "down_payment_percent"} & set(overwrite):
+        if fields.get("down_payment") is not None:
+            state["down_payment"] = fields["down_payment"]
+            state["down_payment_percent"] = None
+        elif fields.get("down_payment_percent") is not None:
+            state["down_payment_percent"] = fields["down_payment_percent"]
+            state["down_payment"] = None
+    # A percentage can only be turned into dollars once the home value is known, and follows a corrected value
+    if state.get("down_payment_percent") is not None and state["home_value"]:
+        state["down_payment"] = int((state["down_payment_percent"] / 100) * state["home_value"])
+
+    if state["down_payment"] is not None and state["home_value"] is not None:
+        state["loan_amount"] = state["home_value"] - state["down_payment"]
+
+def application_fields() -> list[str]:
+    """The fields the application asks for, in order, skipping dimensions the rate sheet does not price on."""
+    from tools.rate_tool import get_rate_calculator
+    dimensions = get_rate_calculator().dimensions
+    return [field for field in APPLICATION_FIELDS if field not in PRICING_DIMENSION_FIELDS or field in dimensions]
+
+def loan_ratios(state: AgentState) -> tuple[float, float]:
+    """
+    LTV and DTI in percent, rounded to the precision shown to the borrower.
+
+    Rates are looked up with the rounded values, so a down payment of exactly 20%
+    (truncated to whole dollars) still prices in the 80% LTV tier.
+    """
+    ltv = (state["loan_amount"] / state["home_value"]) * 100
+    dti = (state["debts"] / (state["income"] / 12)) * 100
+    return round(ltv, 1), round(dti, 1)
+
+def describe_application(state: AgentState, ltv: float, dti: float, separator: str) -> str:
+    """The collected application details, one per line; product and occupancy only if given."""
+    lines = [
+        f"Credit Score: {state['credit_score']}",
+        f"Loan Amount: {state['loan_amount']:,}",
+        f"Home Value: ${state['home_value']:,}",
+        f"LTV: {ltv:.1f}%",
+        f"DTI: {dti:.1f}%",
+        f"Loan Term: {state['loan_term']} years",
+    ]
+    if state.get("product"):
+        lines.append(f"Product: {describe_choice(state['product'])}")
+    if state.get("occupancy"):
+        lines.append(f"Occupancy: {describe_choice(state['occupancy'])}")
+    return separator.join(lines)
+
+def ask_next_field(state: AgentState, prefix: str = "") -> AgentState:
+    """Ask for the first application field still missing, or summarize once everything is collected."""
+    if state["credit_score"] is not None and state["credit_score"] < 620 and state.get("subprime_continue") is None:
+        state["final_response"] = "Score below 620 is considered subprime and is much harder to approve. You should improve your credit score first, but if you want to continue the process, we can. Do you want to continue? (yes/no)"
+        state["application_step"] = "subprime_confirmation"
+        return state
 
-    if response.upper() == "NONE":
-        return None
+    for field in application_fields():
+        if state.get(field) is None:
+            state["final_response"] = prefix + APPLICATION_QUESTIONS[field]
+            state["application_step"] = field
+            return state
+
+    ltv, dti = loan_ratios(state)
+    details = describe_application(state, ltv, dti, separator="\n\n")
+    state["final_response"] = f"Got it! We can see if you will be approved or not.\n\n{details}\n\nWould you like to see your rate?"
+    state["application_step"] = "calculate_rate"
+    return state
 
-    # Clean response: remove any non-digit characters except decimal point
-    cleaned = ''.join(c for c in response if c.isdigit() or c == '.')
+def describe_choice(value: str) -> str:
+    """Render a product or occupancy value for display."""
+    return "FHA" if value == "fha" else value.replace("_", " ").capitalize()
 
-    try:
-        return float(cleaned) if cleaned else None
-    except ValueError:
-        return None
+def discard_prefetches(state: AgentState) -> None:
+    """Drop the speculative FAQ lookup and retrieval for a turn that does not need them."""
+    discard_prefetch(state.get("faq_prefetch_id"))
+    discard_prefetch(state.get("prefetch_id"))
+    state["faq_prefetch_id"] = None
+    state["prefetch_id"] = None
 
 # Node functions
 def validate_topic(state: AgentState) -> AgentState:
@@ -87,6 +282,11 @@ def validate_topic(state: AgentState) -> AgentState:
     user_input = state["user_input"].strip()
     user_input_lower = user_input.lower()
 
+    # Most turns here end in Q&A, so look up the FAQ and retrieve while the topic and intent are classified
+    discard_prefetches(state)
+    state["faq_prefetch_id"] = prefetch_faq(state["user_input"])
+    state["prefetch_id"] = prefetch_documents(state["user_input"], k=RETRIEVAL_K)
+
     greeting_prompt = ChatPromptTemplate.from_messages([
         ("system", """You are a greeting detector. Determine if the user's message is a greeting (like "hi", "hello", "hey", "good morning", etc.).
 
@@ -94,7 +294,7 @@ def validate_topic(state: AgentState) -> AgentState:
         ("human", "{input}")
     ])
 
-    greeting_chain = greeting_prompt | llm
+    greeting_chain = cached_chain(greeting_prompt, PRIORITY_ROUTING)
     greeting_result = greeting_chain.invoke({"input": user_input})
 
     is_greeting = greeting_result.content.strip().lower() == "yes"
@@ -118,7 +318,7 @@ def validate_topic(state: AgentState) -> AgentState:
         ("human", "{input}")
     ])
 
-    chain = prompt | llm
+    chain = cached_chain(prompt, PRIORITY_ROUTING)
     result = chain.invoke({"input": state["user_input"]})
 
     is_relevant = result.content.strip().lower() == "yes"
@@ -126,6 +326,7 @@ def validate_topic(state: AgentState) -> AgentState:
     if not is_relevant:
         state["final_response"] = "Sorry, I am only an expert in loan and mortgage related things. Please ask a question related to that or let me know if you want to start an application."
         state["mode"] = "error"
+        discard_prefetches(state)
     else:
         # Reset mode if it was previously in error state
         if state.get("mode") == "error":
@@ -158,21 +359,59 @@ def route_intent(state: AgentState) -> AgentState:
         ("human", "{input}")
     ])
 
-    chain = prompt | llm
+    chain = cached_chain(prompt, PRIORITY_ROUTING)
     result = chain.invoke({"input": state["user_input"]})
 
     mode = result.content.strip().lower()
     state["mode"] = mode if mode in ["qa", "application"] else "qa"
 
+    if state["mode"] != "qa":
+        discard_prefetches(state)
+
+    return state
+
+def answer_from_faq(state: AgentState) -> AgentState:
+    """Answer with a reviewed FAQ answer when the question matches one, skipping retrieval and the LLM."""
+    prefetch_id = state.get("faq_prefetch_id")
+    state["faq_prefetch_id"] = None
+    match = take_prefetched_faq(prefetch_id) if prefetch_id is not None else match_faq(state["user_input"])
+
+    if match is None:
+        state["faq_match"] = None
+        return state
+
+    discard_prefetch(state.get("prefetch_id"))
+    state["prefetch_id"] = None
+    state["final_response"] = match.entry.answer
+    state["faq_match"] = {
+        "question": match.entry.question,
+        "source": match.entry.source,
+        "similarity": round(match.similarity, 3),
+    }
+    print(f"[INFO] Answered from FAQ ({match.similarity:.3f} similar to {match.entry.question!r})")
+
     return state
 
 def retrieve_documents(state: AgentState) -> AgentState:
-    """Retrieve relevant documents from vector store."""
-    retriever = get_retriever(k=3)
-    docs = retriever.invoke(state["user_input"])
+    """Retrieve relevant documents from vector store, using the prefetch started in validate_topic if any."""
+    docs = take_prefetched_documents(state.get("prefetch_id"))
+    state["prefetch_id"] = None
+    if docs is None:
+        retriever = get_retriever(k=RETRIEVAL_K)
+        docs = retriever.invoke(state["user_input"])
+
+    # Merge overlapping chunks and drop repeated text before paying for it in two prompts
+    assembled = assemble_context(docs, token_budget=CONTEXT_TOKEN_BUDGET)
 
     state["retrieved_docs"] = docs
-    state["context"] = "\n\n".join([doc.page_content for doc in docs])
+    state["context"] = assembled.text
+    state["context_stats"] = {
+        "raw_tokens": assembled.raw_tokens,
+        "context_tokens": assembled.context_tokens,
+        "saved_tokens": assembled.saved_tokens,
+    }
+    print(f"[INFO] Context assembly: {assembled.raw_tokens} -> {assembled.context_tokens} tokens "
+          f"({assembled.saved_tokens} saved per prompt, {len(docs)} chunks -> {len(assembled.passages)} passages)")
 
     return state
 
@@ -190,7 +429,7 @@ def check_relevance(state: AgentState) -> AgentState:
         ("human", "Is the context relevant?")
     ])
 
-    chain = prompt | llm
+    chain = prompt | get_llm(PRIORITY_QA)
     result = chain.invoke({
         "context": state.get("context", ""),
         "question": state["user_input"]
@@ -225,7 +464,7 @@ def answer_question(state: AgentState) -> AgentState:
             ("human", "{question}")
         ])
 
-    chain = prompt | llm
+    chain = prompt | get_llm(PRIORITY_QA)
 
     if using_internal_docs:
         result = chain.invoke({
@@ -242,29 +481,29 @@ def answer_question(state: AgentState) -> AgentState:
     return state
 
 def start_application(state: AgentState) -> AgentState:
-    """Start the mortgage application process."""
-    state["final_response"] = "Great! Let's start your mortgage application. First, what is your credit score?"
-    state["application_step"] = "credit_score"
+    """Start the mortgage application process, keeping any details given with the request."""
+    # Answers from an earlier application in this conversation don't carry over
+    blank = initial_state()
+    for field in APPLICATION_STATE_FIELDS:
+        state[field] = blank[field]
 
-    return state
+    fields = extract_application_fields(state["user_input"]) if any(c.isdigit() for c in state["user_input"]) else {}
+    apply_application_fields(state, fields)
+
+    if state["credit_score"] is None:
+        state["final_response"] = "Great! Let's start your mortgage application. First, what is your credit score?"
+        state["application_step"] = "credit_score"
+        return state
+
+    return ask_next_field(state, "Great! Let's start your mortgage application. ")
 
 def process_credit_score(state: AgentState) -> AgentState:
     """Process credit score input."""
-    credit_score = extract_number(state["user_input"], "credit score")
-
-    if credit_score is not None:
-        credit_score = int(credit_score)
-        state["credit_score"] = credit_score
-
-        if credit_score < 620:
-            state["final_response"] = "Score below 620 is considered subprime and is much harder to approve. You should improve your credit score first, but if you want to continue the process, we can. Do you want to continue? (yes/no)"
-            state["application_step"] = "subprime_confirmation"
-        else:
-            state["final_response"] = "Great! What is the estimated home value/price?"
-            state["application_step"] = "home_value"
-    else:
-        state["final_response"] = "Please enter a valid credit score (numeric value)."
-        state["application_step"] = "credit_score"
+    if state["credit_score"] is not None:
+        return ask_next_field(state, "Great! ")
+
+    state["final_response"] = "Please enter a valid credit score (numeric value)."
+    state["application_step"] = "credit_score"
 
     return state
 
@@ -274,154 +513,134 @@ def process_subprime_confirmation(state: AgentState) -> AgentState:
 
     if user_response in ["yes", "y", "continue", "proceed"]:
         state["subprime_continue"] = True
-        state["final_response"] = "Understood. Let's continue. What is the estimated home value/price?"
-        state["application_step"] = "home_value"
-    else:
-        state["subprime_continue"] = False
-        state["final_response"] = "I understand. I'd recommend working on improving your credit score before applying. Feel free to come back when you're ready!"
-        state["application_step"] = "ended"
+        return ask_next_field(state, "Understood. Let's continue. ")
+
+    state["subprime_continue"] = False
+    state["final_response"] = "I understand. I'd recommend working on improving your credit score before applying. Feel free to come back when you're ready!"
+    state["application_step"] = "ended"
 
     return state
 
 def process_home_value(state: AgentState) -> AgentState:
     """Process home value input."""
-    home_value = extract_number(state["user_input"], "home value")
+    if state["home_value"] is not None:
+        return ask_next_field(state)
 
-    if home_value is not None:
-        state["home_value"] = int(home_value)
-        state["final_response"] = "How much down payment can you make?"
-        state["application_step"] = "down_payment"
-    else:
-        state["final_response"] = "Please enter a valid home value (numeric value)."
-        state["application_step"] = "home_value"
+    state["final_response"] = "Please enter a valid home value (numeric value)."
+    state["application_step"] = "home_value"
 
     return state
 
 def process_down_payment(state: AgentState) -> AgentState:
     """Process down payment input (can be dollar amount or percentage)."""
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a data extraction assistant. Extract the down payment from the user's message.
-
-        The user may provide:
-        1. A dollar amount (e.g., "$50,000", "50000", "fifty thousand")
-        2. A percentage (e.g., "10%", "10 percent", "ten percent")
+    if state["down_payment"] is not None:
+        return ask_next_field(state)
 
-        Return ONLY in this format:
-        - If dollar amount: "AMOUNT:50000"
-        - If percentage: "PERCENT:10"
-        - If cannot determine: "NONE"
-
-        Examples:
-        - "I can put down $50,000" -> AMOUNT:50000
-        - "10%" -> PERCENT:10
-        - "I want to put down 20 percent" -> PERCENT:20
-        - "I don't know" -> NONE"""),
-        ("human", "{input}")
-    ])
-
-    chain = prompt | llm
-    result = chain.invoke({"input": state["user_input"]})
-    response = result.content.strip()
-
-    down_payment_amount = None
-
-    if response.startswith("AMOUNT:"):
-        try:
-            down_payment_amount = int(float(response.split(":")[1]))
-        except:
-            pass
-    elif response.startswith("PERCENT:"):
-        try:
-            percentage = float(response.split(":")[1])
-            down_payment_amount = int((percentage / 100) * state["home_value"])
-        except:
-            pass
-
-    if down_payment_amount is not None:
-        state["down_payment"] = down_payment_amount
-        # Calculate loan amount
-        state["loan_amount"] = state["home_value"] - down_payment_amount
-        state["final_response"] = "What is your annual income?"
-        state["application_step"] = "income"
-    else:
-        state["final_response"] = "Please enter a valid down payment amount (either a dollar amount or percentage)."
-        state["application_step"] = "down_payment"
+    state["final_response"] = "Please enter a valid down payment amount (either a dollar amount or percentage)."
+    state["application_step"] = "down_payment"
 
     return state
 
 def process_income(state: AgentState) -> AgentState:
     """Process annual income input."""
-    income = extract_number(state["user_input"], "annual income")
+    if state["income"] is not None:
+        return ask_next_field(state)
 
-    if income is not None:
-        state["income"] = int(income)
-        state["final_response"] = "What are your total monthly debt payments?"
-        state["application_step"] = "debts"
-    else:
-        state["final_response"] = "Please enter a valid annual income (numeric value)."
-        state["application_step"] = "income"
+    state["final_response"] = "Please enter a valid annual income (numeric value)."
+    state["application_step"] = "income"
 
     return state
 
 def process_debts(state: AgentState) -> AgentState:
     """Process monthly debts input."""
-    debts = extract_number(state["user_input"], "monthly debt payment")
+    if state["debts"] is not None:
+        return ask_next_field(state)
 
-    if debts is not None:
-        state["debts"] = debts
-        state["final_response"] = "What loan term do you prefer? (15 or 30 years)"
-        state["application_step"] = "loan_term"
-    else:
-        state["final_response"] = "Please enter a valid monthly debt amount (numeric value)."
-        state["application_step"] = "debts"
+    state["final_response"] = "Please enter a valid monthly debt amount (numeric value)."
+    state["application_step"] = "debts"
 
     return state
 
 def process_loan_term(state: AgentState) -> AgentState:
     """Process loan term input."""
-    user_input = state["user_input"].strip()
+    if state["loan_term"] is not None:
+        return ask_next_field(state)
 
-    if "15" in user_input:
-        state["loan_term"] = 15
-    elif "30" in user_input:
-        state["loan_term"] = 30
-    else:
-        state["final_response"] = "Please choose either 15 or 30 years."
-        state["application_step"] = "loan_term"
-        return state
+    state["final_response"] = "Please choose either 15 or 30 years."
+    state["application_step"] = "loan_term"
 
-    ltv = (state["loan_amount"] / state["home_value"]) * 100
-    monthly_income = state["income"] / 12
-    dti = (state["debts"] / monthly_income) * 100
+    return state
 
-    state["final_response"] = f"Got it! We can see if you will be approved or not.\n\nCredit Score: {state['credit_score']}\n\nLoan Amount: {state['loan_amount']:,}\n\nHome Value: {state['home_value']:,}\n\nLTV: {ltv:.1f}%\n\nDTI: {dti:.1f}%\n\nLoan Term: {state['loan_term']} years\n\nWould you like to see your rate?"
-    state["application_step"] = "calculate_rate"
+def process_product(state: AgentState) -> AgentState:
+    """Process loan product input."""
+    if state["product"] is not None:
+        return ask_next_field(state)
+
+    state["final_response"] = "Please choose conventional, FHA, or jumbo."
+    state["application_step"] = "product"
+
+    return state
+
+def process_occupancy(state: AgentState) -> AgentState:
+    """Process occupancy input."""
+    if state["occupancy"] is not None:
+        return ask_next_field(state)
+
+    state["final_response"] = "Please choose primary residence, second home, or investment property."
+    state["application_step"] = "occupancy"
 
     return state
 
+def describe_eligibility(state: AgentState, eligibility) -> Optional[str]:
+    """Turn the nearest qualifying tier into changes the borrower can act on."""
+    if eligibility is None:
+        return None
+
+    ltv, dti = loan_ratios(state)
+    options = []
+    if eligibility.max_ltv is not None and ltv > eligibility.max_ltv:
+        max_loan = eligibility.max_ltv / 100 * state["home_value"]
+        additional_down = math.ceil(state["loan_amount"] - max_loan)
+        if additional_down > 0:
+            options.append(f"• Increase your down payment by at least ${additional_down:,} (to {100 - eligibility.max_ltv:g}% down)")
+    if eligibility.max_dti is not None and dti > eligibility.max_dti:
+        max_debts = math.floor(eligibility.max_dti / 100 * state["income"] / 12)
+        if max_debts < state["debts"]:
+            options.append(f"• Reduce your monthly debt payments to ${max_debts:,} or less")
+    if eligibility.min_credit is not None and eligibility.min_credit > state["credit_score"]:
+        options.append(f"• Raise your credit score to at least {eligibility.min_credit}")
+
+    if not options:
+        return None
+    return "Any one of these changes would qualify you for a rate:\n\n" + "\n".join(options)
+
 def calculate_rate(state: AgentState) -> AgentState:
     """Calculate the interest rate based on the collected application data."""
-    # Calculate LTV and DTI
-    ltv = (state["loan_amount"] / state["home_value"]) * 100
-    monthly_income = state["income"] / 12
-    dti = (state["debts"] / monthly_income) * 100
+    ltv, dti = loan_ratios(state)
 
     # Use rate calculation tool
-    input_data = f"{state['credit_score']},{ltv:.1f},{dti:.1f},{state['loan_term']}"
-    tool_result = rate_calculation_tool.run(input_data)
-
-    rate = None
-    rate_match = re.search(r'(\d+\.\d+)%', tool_result)
-    if rate_match:
-        rate = float(rate_match.group(1))
-        state["calculated_rate"] = rate
+    from tools.rate_tool import rate_quote_tool, format_rate_quote
+    quote = rate_quote_tool.invoke({
+        "credit_score": state["credit_score"],
+        "ltv": ltv,
+        "dti": dti,
+        "loan_term": state["loan_term"],
+        "product": state["product"],
+        "occupancy": state["occupancy"],
+        "loan_amount": state["loan_amount"]
+    })
+    state["calculated_rate"] = quote.rate
 
-    summary = f"Thank you! Based on your information:\n\nCredit Score: {state['credit_score']}\nLoan Amount: {state['loan_amount']:,}\nHome Value: ${state['home_value']:,}\nLTV: {ltv:.1f}%\nDTI: {dti:.1f}%\nLoan Term: {state['loan_term']} years"
+    details = describe_application(state, ltv, dti, separator="\n")
+    summary = f"Thank you! Based on your information:\n\n{details}"
 
-    if rate:
-        state["final_response"] = f"{summary}\n\n{tool_result} Let me know if you have any other questions!"
+    if quote.rate is not None:
+        state["final_response"] = f"{summary}\n\n{format_rate_quote(quote)} Let me know if you have any other questions!"
     else:
-        state["final_response"] = f"{summary}\n\n{tool_result}"
+        state["final_response"] = f"{summary}\n\n{format_rate_quote(quote, include_limits=False)}"
+        suggestions = describe_eligibility(state, quote.eligibility)
+        if suggestions:
+            state["final_response"] += f"\n\n{suggestions}"
 
     state["application_step"] = "ended"
     return state
@@ -433,7 +652,16 @@ def route_after_validation(state: AgentState) -> str:
     return "valid"
 
 def check_app_step(state: AgentState) -> AgentState:
-    """Pass-through node to check application step."""
+    """
+    Extract every application field found in an answer, not only the one that was asked for,
+    so the step processor can skip ahead to the first field still missing.
+    """
+    step = state.get("application_step")
+    if step in APPLICATION_FIELDS:
+        fields = extract_application_fields(state["user_input"], step)
+        # The answer to the question just asked always counts; other answers change only when corrected
+        overwrite = set(fields) if is_correction(state["user_input"]) else {step}
+        apply_application_fields(state, fields, overwrite)
     return state
 
 def route_by_app_step(state: AgentState) -> str:
@@ -454,23 +682,34 @@ def route_by_app_step(state: AgentState) -> str:
         return "process_debts"
     elif app_step == "loan_term":
         return "process_loan_term"
+    elif app_step == "product":
+        return "process_product"
+    elif app_step == "occupancy":
+        return "process_occupancy"
     elif app_step == "calculate_rate":
         return "calculate_rate"
     else:
         return "route_intent"
 
+def route_after_faq(state: AgentState) -> str:
+    """Route after the FAQ lookup."""
+    return "answered" if state.get("faq_match") else "retrieve"
+
 def route_mode(state: AgentState) -> str:
     """Route to appropriate node based on mode."""
     return state["mode"]
 
 def create_workflow():
     """Create and compile the LangGraph workflow."""
+    from langgraph.graph import StateGraph, END
+
     workflow = StateGraph(AgentState)
 
     # Add nodes
     workflow.add_node("validate_topic", validate_topic)
     workflow.add_node("check_app_step", check_app_step)
     workflow.add_node("route_intent", route_intent)
+    workflow.add_node("answer_from_faq", answer_from_faq)
     workflow.add_node("retrieve_documents", retrieve_documents)
     workflow.add_node("check_relevance", check_relevance)
     workflow.add_node("answer_question", answer_question)
@@ -482,6 +721,8 @@ def create_workflow():
     workflow.add_node("process_income", process_income)
     workflow.add_node("process_debts", process_debts)
     workflow.add_node("process_loan_term", process_loan_term)
+    workflow.add_node("process_product", process_product)
+    workflow.add_node("process_occupancy", process_occupancy)
     workflow.add_node("calculate_rate", calculate_rate)
 
     # Define edges
@@ -499,6 +740,8 @@ def create_workflow():
             "process_income": "process_income",
             "process_debts": "process_debts",
             "process_loan_term": "process_loan_term",
+            "process_product": "process_product",
+            "process_occupancy": "process_occupancy",
             "calculate_rate": "calculate_rate",
         }
     )
@@ -516,11 +759,20 @@ def create_workflow():
         "route_intent",
         route_mode,
         {
-            "qa": "retrieve_documents",
+            "qa": "answer_from_faq",
             "application": "start_application"
         }
     )
 
+    workflow.add_conditional_edges(
+        "answer_from_faq",
+        route_after_faq,
+        {
+            "answered": END,
+            "retrieve": "retrieve_documents"
+        }
+    )
+
     workflow.add_edge("retrieve_documents", "check_relevance")
     workflow.add_edge("check_relevance", "answer_question")
     workflow.add_edge("answer_question", END)
@@ -532,6 +784,27 @@ def create_workflow():
     workflow.add_edge("process_income", END)
     workflow.add_edge("process_debts", END)
     workflow.add_edge("process_loan_term", END)
+    workflow.add_edge("process_product", END)
+    workflow.add_edge("process_occupancy", END)
     workflow.add_edge("calculate_rate", END)
 
     return workflow.compile()
+
+
+def get_workflow():
+    """Return the compiled workflow, shared by every session in this process."""
+    global _workflow
+    if _workflow is None:
+        _workflow = create_workflow()
+    return _workflow
+
+def warm_up():
+    """Pre-load the chat model, search and FAQ indexes, rate sheet and compiled graph so the first turn is fast."""
+    from tools.rate_tool import get_rate_calculator
+
+    get_chat_model()
+    get_vector_store()
+    get_lexical_index()
+    get_faq_index()
+    get_rate_calculator()
+    get_workflow()